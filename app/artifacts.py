@@ -0,0 +1,140 @@
+import asyncio
+import gzip
+import os
+import shutil
+from contextlib import asynccontextmanager
+from pathlib import Path
+from app.config import settings
+
+
+class ArtifactStore:
+    """
+    실패 진단용 파일 저장소 (스크린샷 / 페이지 HTML / Playwright trace)
+    - 실행(run)마다 별도 디렉터리: <root>/run-<run_id>-task-<task_id>/ (동시 실행끼리 덮어쓰지 않음)
+    - 스크린샷은 JPEG, HTML 은 gzip 으로 압축
+    - 캡처는 메모리(bytes)로 받고 파일 쓰기/압축은 스레드에서 (이벤트 루프를 막지 않음)
+    - 새 run 디렉터리가 생기면 개수(max_runs)/전체 크기(max_bytes) 한도를 넘는 오래된 run 부터 삭제
+    """
+
+    def __init__(self, root, max_runs=200, max_bytes=200 * 1024 * 1024, jpeg_quality=60):
+        self.root = Path(root)
+        self.max_runs = max_runs
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+
+    def run_dir(self, run_id, task_id):
+        return self.root / f"run-{run_id:06d}-task-{task_id}"
+
+    async def screenshot(self, page, run_id, task_id, name):
+        data = await page.screenshot(type="jpeg", quality=self.jpeg_quality)
+        return await asyncio.to_thread(self._write, run_id, task_id, f"{name}.jpg", data)
+
+    async def html(self, page, run_id, task_id, name):
+        content = await page.content()
+        return await asyncio.to_thread(
+            self._write, run_id, task_id, f"{name}.html.gz", content.encode("utf-8"), True
+        )
+
+    async def capture(self, page, run_id, task_id, name, html=False):
+        """스크린샷(+ HTML) 저장 -> run 디렉터리 (페이지가 닫혔거나 실패하면 None)"""
+        if page is None or page.is_closed():
+            return None
+        try:
+            path = await self.screenshot(page, run_id, task_id, name)
+            if html:
+                await self.html(page, run_id, task_id, name)
+            return path.parent
+        except Exception as e:
+            print(f"Artifact capture warning ({name}): {e}")
+            return None
+
+    @asynccontextmanager
+    async def tracing(self, context, run_id, task_id, enabled=True):
+        """
+        run 동안 Playwright trace 기록, 실패했을 때만 trace.zip 저장 (성공하면 버림)
+        with 블록 안에서 예외가 나거나 recorder.failed = True 로 표시하면 실패로 봄
+        """
+        recorder = _TraceRecorder()
+        if enabled:
+            try:
+                await context.tracing.start(screenshots=True, snapshots=True)
+                recorder.started = True
+            except Exception as e:
+                print(f"Trace start warning: {e}")
+        try:
+            yield recorder
+        except BaseException:
+            recorder.failed = True
+            raise
+        finally:
+            if recorder.started:
+                await self._stop_trace(context, run_id, task_id, recorder.failed)
+
+    async def _stop_trace(self, context, run_id, task_id, keep):
+        try:
+            if not keep:
+                await context.tracing.stop()
+                return
+            path = await asyncio.to_thread(self._prepare, run_id, task_id)
+            await context.tracing.stop(path=str(path / "trace.zip"))
+            print(f"🧾 Saved failure trace: {path / 'trace.zip'}")
+        except Exception as e:
+            print(f"Trace stop warning: {e}")
+
+    # ---- 파일 (스레드) ----
+
+    def _prepare(self, run_id, task_id):
+        directory = self.run_dir(run_id, task_id)
+        if not directory.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            self.prune(keep=directory)
+        return directory
+
+    def _write(self, run_id, task_id, filename, data, compress=False):
+        path = self._prepare(run_id, task_id) / filename
+        if compress:
+            data = gzip.compress(data, compresslevel=6)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return path
+
+    def prune(self, keep=None):
+        """한도를 넘는 오래된 run 디렉터리 삭제 (keep 은 방금 만든 디렉터리) -> 삭제한 개수"""
+        if not self.root.exists():
+            return 0
+        runs = []
+        for directory in self.root.iterdir():
+            if not directory.is_dir() or not directory.name.startswith("run-"):
+                continue
+            size = sum(f.stat().st_size for f in directory.iterdir() if f.is_file())
+            runs.append((directory.stat().st_mtime, directory, size))
+        runs.sort(key=lambda r: r[0])
+
+        total = sum(size for _, _, size in runs)
+        count = len(runs)
+        removed = 0
+        for _, directory, size in runs:
+            if count <= self.max_runs and total <= self.max_bytes:
+                break
+            if directory == keep:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            count -= 1
+            total -= size
+            removed += 1
+        return removed
+
+
+class _TraceRecorder:
+    def __init__(self):
+        self.started = False
+        self.failed = False
+
+
+artifacts = ArtifactStore(
+    settings.ARTIFACT_DIR,
+    max_runs=settings.ARTIFACT_MAX_RUNS,
+    max_bytes=settings.ARTIFACT_MAX_MB * 1024 * 1024,
+    jpeg_quality=settings.ARTIFACT_JPEG_QUALITY,
+)
@@ -0,0 +1,201 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from app import storage_state
+
+
+class BrowserContextPool:
+    """
+    계정별 BrowserContext 풀
+    - 브라우저(Chromium) 프로세스는 하나만 사용
+    - 계정마다 격리된 컨텍스트(쿠키/스토리지 분리)
+    - 사용했던 컨텍스트는 다음 실행에 재사용 (warm)
+    - 풀이 가득 차면 가장 오래 안 쓴(LRU) 유휴 컨텍스트를 닫음
+    - 꺼내주기 전에 헬스 체크
+    - 컨텍스트 생성 시 계정 storage state(쿠키 + localStorage)를 바로 로드하고,
+      반납할 때 내용이 바뀌었으면 다시 저장
+    - 그 사이 다른 곳(로그인 창, 다른 워커 프로세스)에서 state 를 다시 썼으면 그 컨텍스트는
+      오래된 세션이므로 저장하지 않고 닫음 (다음 실행에서 새 state 로 다시 만듦)
+    """
+
+    def __init__(self, engine, max_size=4):
+        self.engine = engine
+        self.max_size = max(1, max_size)
+        self._contexts = OrderedDict()  # account_id -> BrowserContext (LRU 순서)
+        self._bases = {}  # account_id -> 그 컨텍스트가 로드/저장한 state 해시
+        self._locks = {}  # account_id -> asyncio.Lock (같은 계정 동시 실행 방지)
+        self._in_use = set()
+        self._slots = asyncio.Semaphore(self.max_size)
+        # 새 컨텍스트가 만들어질 때 호출할 async 함수 (bench/ 의 mock 서버 라우팅 등)
+        self.context_hooks = []
+
+    @asynccontextmanager
+    async def lease(self, account):
+        """
+        계정 컨텍스트를 빌려줌. 같은 계정은 한 번에 한 실행만 사용할 수 있고,
+        동시에 빌려줄 수 있는 컨텍스트 수는 max_size로 제한됨.
+        """
+        lock = self._locks.setdefault(account.id, asyncio.Lock())
+        async with lock:
+            async with self._slots:
+                context = await self._checkout(account)
+                self._in_use.add(account.id)
+                try:
+                    yield context
+                finally:
+                    self._in_use.discard(account.id)
+                    if self._contexts.get(account.id) is context:
+                        await self._persist_state(account.id, context)
+                    else:
+                        # 사용 중에 새 로그인 컨텍스트로 교체됨 -> 오래된 세션은 저장하지 않고 닫음
+                        await _close_quietly(context)
+
+    async def prewarm(self, accounts):
+        """계정 컨텍스트를 미리 만들어 둠 (풀 크기까지, 이미 있으면 그대로)"""
+        for account in accounts[: self.max_size]:
+            if account.id in self._contexts:
+                continue
+            async with self.lease(account):
+                pass
+
+    async def _checkout(self, account):
+        context = self._contexts.get(account.id)
+        if context is not None:
+            if not await self._is_healthy(context):
+                print(f"♻️ Context for account {account.id} is unhealthy, recreating...")
+                await self._discard(account.id)
+            elif await asyncio.to_thread(storage_state.stored_hash, account.id) != self._bases.get(account.id):
+                print(f"♻️ Session for account {account.id} was saved elsewhere, recreating context...")
+                await self._discard(account.id)
+            else:
+                self._contexts.move_to_end(account.id)
+                return context
+
+        await self._evict_if_full()
+
+        context, base = await self._create(account)
+        self._register(account.id, context, base)
+        print(f"🆕 Created context for account {account.id} (pool: {len(self._contexts)}/{self.max_size})")
+        return context
+
+    async def new_context(self, account=None):
+        """
+        공유 브라우저 위에 새 컨텍스트 생성 (풀에는 등록하지 않음)
+        account 가 없으면 빈 세션 (예: 새 계정 로그인 창) -> 로그인 후 adopt() 로 풀에 넘길 수 있음
+        """
+        context, _ = await self._create(account)
+        return context
+
+    async def _create(self, account):
+        """-> (context, 로드한 state 해시 / 없으면 None)"""
+        browser = await self.engine.get_browser()
+        # 서비스 워커가 요청을 가로채면 리소스 차단 라우팅이 적용되지 않음
+        options = {"viewport": {"width": 1280, "height": 800}, "service_workers": "block"}
+        # 저장된 로그인 세션 복원 (새 컨텍스트일 때만)
+        state = await asyncio.to_thread(storage_state.load, account.id) if account else None
+        if state:
+            options["storage_state"] = state
+        context = await browser.new_context(**options)
+        for hook in self.context_hooks:
+            await hook(context)
+        return context, storage_state.state_hash(state) if state else None
+
+    async def adopt(self, account_id, context):
+        """
+        풀 밖에서 만든 컨텍스트를 계정 컨텍스트로 등록 (로그인 직후 세션 그대로 재사용)
+        state 는 미리 저장되어 있어야 함. 그 계정 컨텍스트가 이미 있으면 오래된 세션이므로
+        새 것으로 교체 (사용 중이면 반납할 때 저장하지 않고 닫음) -> 등록했으면 True
+        """
+        base = await asyncio.to_thread(storage_state.stored_hash, account_id)
+        old = self._contexts.pop(account_id, None)
+        self._bases.pop(account_id, None)
+        if old is None:
+            await self._evict_if_full()
+        elif account_id not in self._in_use:
+            await _close_quietly(old)
+        self._register(account_id, context, base)
+        print(f"🆕 Adopted context for account {account_id} (pool: {len(self._contexts)}/{self.max_size})")
+        return True
+
+    async def save_state(self, account_id, context):
+        """실행 중 로그인한 세션을 바로 저장 (반납 때 다른 곳에서 쓴 것으로 오인하지 않도록 기준 해시도 갱신)"""
+        state = await context.storage_state()
+        await asyncio.to_thread(storage_state.save, account_id, state)
+        if self._contexts.get(account_id) is context:
+            self._bases[account_id] = storage_state.state_hash(state)
+
+    def _register(self, account_id, context, base):
+        context.on("close", lambda _: self._forget(account_id, context))
+        self._contexts[account_id] = context
+        self._bases[account_id] = base
+
+    async def _persist_state(self, account_id, context):
+        try:
+            state = await context.storage_state()
+        except Exception:
+            return  # 컨텍스트가 이미 닫힘
+        try:
+            result = await asyncio.to_thread(
+                storage_state.save_if_current, account_id, state, self._bases.get(account_id)
+            )
+        except Exception as e:
+            print(f"Storage state save warning: {e}")
+            return
+        if result == "saved":
+            self._bases[account_id] = storage_state.state_hash(state)
+            print(f"💾 Saved updated storage state for account {account_id}")
+        elif result == "stale":
+            print(f"♻️ Session for account {account_id} was saved elsewhere, dropping stale context")
+            await self._discard(account_id)
+
+    async def _is_healthy(self, context):
+        browser = self.engine.browser
+        if browser is None or not browser.is_connected():
+            return False
+        try:
+            # 실제 브라우저 왕복으로 컨텍스트가 살아있는지 확인
+            await context.cookies()
+            return True
+        except Exception:
+            return False
+
+    async def _evict_if_full(self):
+        while len(self._contexts) >= self.max_size:
+            victim = next((aid for aid in self._contexts if aid not in self._in_use), None)
+            if victim is None:
+                # 모두 사용 중 (슬롯 세마포어 때문에 실제로는 발생하지 않음)
+                return
+            print(f"🧹 Evicting idle context for account {victim} (LRU)")
+            await self._discard(victim)
+
+    async def _discard(self, account_id):
+        context = self._contexts.pop(account_id, None)
+        self._bases.pop(account_id, None)
+        if context is not None:
+            await _close_quietly(context)
+
+    def _forget(self, account_id, context):
+        if self._contexts.get(account_id) is context:
+            del self._contexts[account_id]
+            self._bases.pop(account_id, None)
+
+    @property
+    def size(self):
+        """현재 열려있는 컨텍스트 수"""
+        return len(self._contexts)
+
+    def clear(self):
+        """브라우저 연결이 끊겼을 때 호출 (컨텍스트는 이미 죽은 상태)"""
+        self._contexts.clear()
+        self._bases.clear()
+
+    async def close(self):
+        for account_id in list(self._contexts):
+            await self._discard(account_id)
+
+
+async def _close_quietly(context):
+    try:
+        await context.close()
+    except Exception:
+        pass
@@ -0,0 +1,79 @@
+import re
+from urllib.parse import urlparse
+
+# 글 등록 API 경로 (SE ONE: .../cafes/{clubid}/menus/{menuid}/articles, 구형: ArticlePost.nhn)
+# 임시저장/자동저장/조회수 등 "article" 이 들어간 다른 요청은 제외
+ARTICLE_CREATE_PATH = re.compile(r"/articles/?$|/ArticlePost\.nhn$", re.IGNORECASE)
+
+
+def cafe_key(cafe_url: str) -> str:
+    """
+    카페 URL에서 카페 식별자 추출 (동시 실행 제한 등 카페 단위 처리에 사용)
+    - .../cafes/31621061/... 또는 ...clubid=31621061  -> "31621061"
+    - https://cafe.naver.com/mycafe                    -> "mycafe"
+    """
+    url = cafe_url or ""
+    match = re.search(r"cafe\.naver\.com/(?:f-e/|ca-fe/)?cafes/(\d+)", url)
+    if match:
+        return match.group(1)
+    match = re.search(r"clubid=(\d+)", url, re.IGNORECASE)
+    if match:
+        return match.group(1)
+    match = re.search(r"cafe\.naver\.com/([A-Za-z0-9_\-]+)", url)
+    if match:
+        return match.group(1).lower()
+    return url
+
+
+def parse_cafe_ids(url):
+    """
+    URL에서 (clubid, menuid) 추출 (없으면 None)
+    - .../cafes/31621061/menus/1, ...cafes/31621061/articles/write?menuId=1
+    - ArticleList.nhn?search.clubid=31621061&search.menuid=1
+    """
+    url = url or ""
+    club_id = menu_id = None
+    match = re.search(r"cafes/(\d+)", url) or re.search(r"clubid=(\d+)", url, re.IGNORECASE)
+    if match:
+        club_id = int(match.group(1))
+    match = re.search(r"/menus/(\d+)", url) or re.search(r"menuid=(\d+)", url, re.IGNORECASE)
+    if match:
+        menu_id = int(match.group(1))
+    return club_id, menu_id
+
+
+def parse_article_id(url):
+    """게시글 URL 에서 글 번호 (.../articles/123, ...articleid=123) / 없으면 None"""
+    match = re.search(r"/articles/(\d+)", url or "") or re.search(r"articleid=(\d+)", url or "", re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def is_article_create(method, url):
+    """글 등록 요청인지 (POST + 등록 API 경로)"""
+    return method == "POST" and bool(ARTICLE_CREATE_PATH.search(urlparse(url or "").path))
+
+
+def is_article_delete(method, url, article_id):
+    """
+    그 글의 삭제 요청인지
+    - DELETE/POST .../articles/{article_id} (SE ONE 화면)
+    - 구형 ArticleDelete.nhn (articleid 파라미터가 있으면 같은 글인지도 확인)
+    조회수/통계 등 글 화면의 다른 요청은 제외
+    """
+    parsed = urlparse(url or "")
+    if re.search(r"/ArticleDelete\.nhn$", parsed.path, re.IGNORECASE):
+        found = parse_article_id(url)
+        return found is None or found == article_id
+    return method in ("DELETE", "POST") and bool(re.search(rf"/articles/{article_id}/?$", parsed.path))
+
+
+def article_url(club_id, article_id):
+    return f"https://cafe.naver.com/ca-fe/cafes/{club_id}/articles/{article_id}"
+
+
+def write_url(club_id, menu_id=None):
+    """글쓰기 페이지 URL (menuid 가 없으면 카페 기본 게시판)"""
+    url = f"https://cafe.naver.com/ca-fe/cafes/{club_id}/articles/write?boardType=L"
+    if menu_id:
+        url += f"&menuId={menu_id}"
+    return url
@@ -0,0 +1,171 @@
+import json
+import re
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+from sqlmodel import Session, select, delete
+from app.config import settings
+from app.database import engine as db_engine
+from app.models import CafeMenu
+from app.cafe import parse_cafe_ids
+
+# 카페 웹이 사이드 메뉴를 그릴 때 쓰는 API (공개 카페는 로그인 없이도 응답)
+MENU_API = "https://apis.naver.com/cafe-web/cafe2/SideMenuList?cafeId={club_id}"
+# 별칭 URL(cafe.naver.com/<name>) -> clubid
+GATE_API = "https://apis.naver.com/cafe-web/cafe2/CafeGateInfo.json?cluburl={name}"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+class BoardNotFound(ValueError):
+    pass
+
+
+def wants_board(board_name):
+    return bool(board_name) and board_name.strip().lower() != "default"
+
+
+def normalize(name):
+    return re.sub(r"\s+", " ", name or "").strip().casefold()
+
+
+def vanity_name(cafe_url):
+    """cafe.naver.com/<name> 형식이면 name (clubid 가 있는 URL 은 None)"""
+    match = re.search(r"cafe\.naver\.com/([A-Za-z0-9_\-]+)/?(?:[?#]|$)", cafe_url or "")
+    if not match or match.group(1).lower() in ("articlelist.nhn", "ca-fe", "f-e"):
+        return None
+    return match.group(1)
+
+
+def menu_api_url(club_id):
+    return MENU_API.format(club_id=club_id)
+
+
+def gate_api_url(name):
+    return GATE_API.format(name=urllib.parse.quote(name))
+
+
+def parse_menus(data):
+    """API 응답에서 [(menu_id, name, menu_type)] (구조가 조금 달라도 menuId/menuName 을 가진 항목을 찾음)"""
+    menus = []
+
+    def walk(value):
+        if isinstance(value, dict):
+            if "menuId" in value and "menuName" in value:
+                try:
+                    menus.append((int(value["menuId"]), str(value["menuName"]), value.get("menuType")))
+                except (TypeError, ValueError):
+                    pass
+            for child in value.values():
+                walk(child)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child)
+
+    walk(data)
+    return menus
+
+
+def parse_club_id(data):
+    """CafeGateInfo 응답에서 cafeId / 없으면 None"""
+    if isinstance(data, dict):
+        for key in ("cafeId", "clubId", "clubid"):
+            if isinstance(data.get(key), (int, str)) and str(data[key]).isdigit():
+                return int(data[key])
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return None
+    for child in values:
+        found = parse_club_id(child)
+        if found:
+            return found
+    return None
+
+
+# ---- DB 캐시 ----
+
+def cached_menus(session, club_id, now=None):
+    """유효 기간 안의 게시판 목록 [CafeMenu] / 없거나 오래됐으면 None"""
+    rows = session.exec(select(CafeMenu).where(CafeMenu.club_id == club_id)).all()
+    if not rows:
+        return None
+    now = now or datetime.now()
+    if now - min(row.fetched_at for row in rows) > timedelta(hours=settings.CAFE_MENU_TTL_HOURS):
+        return None
+    return rows
+
+
+def store_menus(club_id, menus):
+    """
+    게시판 목록 교체 -> [CafeMenu]
+    캐시는 별도 세션에서 커밋 (호출한 쪽 세션의 저장 안 된 변경까지 커밋하지 않도록)
+    """
+    now = datetime.now()
+    rows = [CafeMenu(club_id=club_id, menu_id=menu_id, name=name, menu_type=menu_type, fetched_at=now)
+            for menu_id, name, menu_type in menus]
+    with Session(db_engine, expire_on_commit=False) as session:
+        session.exec(delete(CafeMenu).where(CafeMenu.club_id == club_id))
+        session.add_all(rows)
+        session.commit()
+    return rows
+
+
+def find_menu(rows, board_name):
+    """게시판 이름 -> menu_id (공백/대소문자 무시, 같은 이름이 여럿이면 게시판(B) 우선) / 없으면 None"""
+    wanted = normalize(board_name)
+    matches = [row for row in rows if normalize(row.name) == wanted]
+    if not matches:
+        return None
+    matches.sort(key=lambda row: row.menu_type != "B")
+    return matches[0].menu_id
+
+
+def suggest(rows, limit=10):
+    boards = [row.name for row in rows if row.menu_type in (None, "B")]
+    return ", ".join(boards[:limit])
+
+
+# ---- Task 저장 시 (동기, 라우트 스레드에서) ----
+
+def fetch_json(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, "Referer": "https://cafe.naver.com/"})
+    with urllib.request.urlopen(request, timeout=settings.CAFE_MENU_FETCH_TIMEOUT_SEC) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def resolve_board(session, task, fetch=fetch_json):
+    """
+    task.board_name -> task.club_id / task.menu_id 채움
+    - 캐시에 없으면 (캐시 이후에 만든 게시판일 수 있음) 목록을 새로 가져와서 다시 확인
+    - 새로 가져온 목록에도 그 이름이 없으면 BoardNotFound (저장 거부)
+    - 목록을 가져올 수 없으면 (네트워크, 비공개 카페) 그대로 두고 실행할 때 다시 시도
+    """
+    if not wants_board(task.board_name):
+        return
+    club_id = parse_cafe_ids(task.cafe_url)[0] or task.club_id
+    if not club_id and vanity_name(task.cafe_url):
+        try:
+            club_id = parse_club_id(fetch(gate_api_url(vanity_name(task.cafe_url))))
+        except Exception as e:
+            print(f"Cafe id lookup failed for {task.cafe_url}: {e}")
+    if not club_id:
+        return
+
+    rows = cached_menus(session, club_id)
+    menu_id = find_menu(rows, task.board_name) if rows is not None else None
+    if menu_id is None:
+        try:
+            menus = parse_menus(fetch(menu_api_url(club_id)))
+        except Exception as e:
+            print(f"Cafe menu fetch failed for {club_id}: {e}")
+            return
+        if not menus:
+            return
+        rows = store_menus(club_id, menus)
+        menu_id = find_menu(rows, task.board_name)
+    if menu_id is None:
+        raise BoardNotFound(f"Board '{task.board_name}' not found in cafe {club_id} (boards: {suggest(rows)})")
+    task.club_id = club_id
+    task.menu_id = menu_id
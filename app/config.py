@@ -9,5 +9,91 @@ class Settings:
     TARGET_CAFE_ID = os.getenv("TARGET_CAFE_ID", "")
     # Chrome CDP 포트 (기존 브라우저 연결용)
     CHROME_CDP_PORT = os.getenv("CHROME_CDP_PORT", "9222")
+    # 계정별 브라우저 컨텍스트 풀 크기 (동시에 열어둘 수 있는 계정 수)
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+    # 서버 시작 시 브라우저/계정 컨텍스트를 백그라운드로 미리 준비
+    BROWSER_PREWARM = os.getenv("BROWSER_PREWARM", "1") == "1"
+    # 작업 큐: 동시 실행 워커 수 (BROWSER_POOL_SIZE 이하 권장), 카페별 동시 실행 수, 최대 대기 작업 수
+    QUEUE_WORKERS = int(os.getenv("QUEUE_WORKERS", "2"))
+    QUEUE_CAFE_CONCURRENCY = int(os.getenv("QUEUE_CAFE_CONCURRENCY", "1"))
+    QUEUE_MAX_DEPTH = int(os.getenv("QUEUE_MAX_DEPTH", "100"))
+    QUEUE_POLL_SEC = float(os.getenv("QUEUE_POLL_SEC", "5"))
+    # 스케줄 확인 주기 (초)
+    SCHEDULER_TICK_SEC = float(os.getenv("SCHEDULER_TICK_SEC", "30"))
+    # DB 위치 (벤치마크 등에서 별도 DB 사용)
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")
+    # SQLite 잠금 대기 시간 (ms): 동시에 쓰는 연결이 있으면 이만큼 기다렸다가 재시도
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    # 워커 프로세스 수: 0 이면 API 프로세스 안에서 실행 (기존 방식)
+    # N 이면 worker.py 프로세스 N개가 각자 브라우저를 띄우고 계정별로 나눠서 실행 (QUEUE_WORKERS 는 프로세스당 동시 실행 수)
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "0"))
+    WORKER_HEARTBEAT_SEC = float(os.getenv("WORKER_HEARTBEAT_SEC", "5"))
+    WORKER_HEARTBEAT_TIMEOUT_SEC = float(os.getenv("WORKER_HEARTBEAT_TIMEOUT_SEC", "60"))
+    # 워커 프로세스의 로그/실행 결과를 API 프로세스의 이벤트 스트림, /metrics 로 옮기는 주기
+    WORKER_RELAY_SEC = float(os.getenv("WORKER_RELAY_SEC", "1"))
+
+    # 실행 모드: 기본은 빠른 모드 (각 단계가 실제 신호 - 페이지 이동, 셀렉터 상태, 등록 응답 - 를 기다림)
+    # INTERACTIVE_MODE=1 이면 "지켜보기" 모드: 아래 WATCH_* 지연이 적용됨
+    INTERACTIVE_MODE = os.getenv("INTERACTIVE_MODE", "0") == "1"
+    WATCH_STEP_DELAY_SEC = float(os.getenv("WATCH_STEP_DELAY_SEC", "0.5")) # 입력 단계 사이
+    WATCH_POST_SUBMIT_SEC = float(os.getenv("WATCH_POST_SUBMIT_SEC", "15")) # 등록 후 결과 화면 유지
+    WATCH_FAILURE_SEC = float(os.getenv("WATCH_FAILURE_SEC", "10")) # 일반 실패 시 화면 유지
+    WATCH_EDITOR_FAILURE_SEC = float(os.getenv("WATCH_EDITOR_FAILURE_SEC", "60")) # 에디터 실패 시 화면 유지
+    # 이벤트 대기 타임아웃 (ms)
+    STEP_TIMEOUT_MS = int(os.getenv("STEP_TIMEOUT_MS", "15000"))
+    LOGIN_TIMEOUT_MS = int(os.getenv("LOGIN_TIMEOUT_MS", "120000"))
+    WRITE_BUTTON_TIMEOUT_MS = int(os.getenv("WRITE_BUTTON_TIMEOUT_MS", "30000"))
+    SUBMIT_TIMEOUT_MS = int(os.getenv("SUBMIT_TIMEOUT_MS", "15000"))
+    # 제목/본문/등록 버튼 후보(페이지 + 프레임)를 동시에 찾을 때 전체 기한
+    LOOKUP_TIMEOUT_MS = int(os.getenv("LOOKUP_TIMEOUT_MS", "3000"))
+    # 새 글 등록 후 이 Task 가 예전에 올린 글을 글 번호로 바로 삭제
+    DELETE_PREVIOUS_POST = os.getenv("DELETE_PREVIOUS_POST", "1") == "1"
+
+    # 재시도: 일시적 실패는 Task.max_retries(없으면 RETRY_MAX)번까지 지수 백오프 + jitter 로 다시 실행
+    RETRY_MAX = int(os.getenv("RETRY_MAX", "2"))
+    RETRY_BASE_SEC = float(os.getenv("RETRY_BASE_SEC", "30"))
+    RETRY_MAX_SEC = float(os.getenv("RETRY_MAX_SEC", "900"))
+    # 카페별 회로 차단: 연속 CIRCUIT_FAILURES 번 실패하면 CIRCUIT_OPEN_SEC 초 동안 그 카페 작업을 보류
+    CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "3"))
+    CIRCUIT_OPEN_SEC = float(os.getenv("CIRCUIT_OPEN_SEC", "300"))
+
+    # 카페 게시판 목록(게시판 이름 -> menuid) 캐시 유효 시간 / 목록 조회 타임아웃
+    CAFE_MENU_TTL_HOURS = float(os.getenv("CAFE_MENU_TTL_HOURS", "24"))
+    CAFE_MENU_FETCH_TIMEOUT_SEC = float(os.getenv("CAFE_MENU_FETCH_TIMEOUT_SEC", "5"))
+
+    # 실패 진단 파일 (run 마다 디렉터리, 오래된 run 부터 개수/용량 한도로 정리)
+    ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+    ARTIFACT_MAX_RUNS = int(os.getenv("ARTIFACT_MAX_RUNS", "200"))
+    ARTIFACT_MAX_MB = int(os.getenv("ARTIFACT_MAX_MB", "200"))
+    ARTIFACT_JPEG_QUALITY = int(os.getenv("ARTIFACT_JPEG_QUALITY", "60"))
+    # Playwright trace 기록 (실패한 run 만 trace.zip 저장)
+    RUN_TRACE = os.getenv("RUN_TRACE", "0") == "1"
+
+    # 실행 로그 버퍼: batch_size 개가 쌓이거나 interval 초가 지나면 한 번에 저장
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "50"))
+    LOG_FLUSH_INTERVAL_SEC = float(os.getenv("LOG_FLUSH_INTERVAL_SEC", "1.0"))
+    # SUCCESS/FAILED 로그는 바로 저장
+    LOG_FLUSH_TERMINAL = os.getenv("LOG_FLUSH_TERMINAL", "1") == "1"
+    # 보관 기간 (일) - 지난 로그/실행 요약은 백그라운드에서 삭제. 0 이면 삭제 안 함
+    LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "14"))
+    RUN_RETENTION_DAYS = int(os.getenv("RUN_RETENTION_DAYS", "90"))
+    RETENTION_INTERVAL_SEC = float(os.getenv("RETENTION_INTERVAL_SEC", "3600"))
+
+    # 로그인 상태 캐시: 마지막 확인 후 TTL 이내이고 인증 쿠키 만료까지 여유가 있으면 naver.com 확인 생략
+    SESSION_CHECK_TTL_MIN = int(os.getenv("SESSION_CHECK_TTL_MIN", "360"))
+    SESSION_EXPIRY_MARGIN_MIN = int(os.getenv("SESSION_EXPIRY_MARGIN_MIN", "60"))
+
+    # 리소스 차단 프로필 (Task.resource_profile 이 비어있을 때): full(차단 없음) / trackers / lite(이미지·미디어·폰트·트래커)
+    RESOURCE_PROFILE = os.getenv("RESOURCE_PROFILE", "lite")
+    # 추가 차단/허용 URL 정규식 (쉼표 구분)
+    RESOURCE_BLOCK_EXTRA = os.getenv("RESOURCE_BLOCK_EXTRA", "")
+    RESOURCE_ALLOW_EXTRA = os.getenv("RESOURCE_ALLOW_EXTRA", "")
+
+    # 본문 입력: bulk(한 번에 삽입) / type(한 글자씩, 느림)
+    CONTENT_INSERT_MODE = os.getenv("CONTENT_INSERT_MODE", "bulk")
+    # 본문 형식 (Task.content_format 이 비어있을 때): text(그대로 삽입) / html(붙여넣기로 서식 유지)
+    CONTENT_FORMAT = os.getenv("CONTENT_FORMAT", "text")
+    # 입력 후 에디터 글자 수가 기대값의 이 비율 이상이면 정상
+    CONTENT_MIN_RATIO = float(os.getenv("CONTENT_MIN_RATIO", "0.9"))
 
 settings = Settings()
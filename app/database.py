@@ -1,14 +1,47 @@
-from sqlmodel import SQLModel, create_engine, Session
+import asyncio
+from sqlalchemy import event
+from sqlmodel import SQLModel, create_engine, Session, update
+from app.config import settings
 
-sqlite_file_name = "database.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
+sqlite_url = settings.DATABASE_URL
 
-connect_args = {"check_same_thread": False}
+# timeout: 다른 연결이 쓰는 중이면 바로 "database is locked" 대신 기다림
+connect_args = {"check_same_thread": False, "timeout": settings.DB_BUSY_TIMEOUT_MS / 1000}
 engine = create_engine(sqlite_url, connect_args=connect_args)
 
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: 읽기와 쓰기가 서로 막지 않음 (워커 프로세스/로그 flush/API 동시 접근)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def run_db(fn, *args, **kwargs):
+    """
+    동기 DB 작업 fn(session, *args, **kwargs) 을 스레드에서 실행 (async 코드에서 이벤트 루프를 막지 않음)
+    커밋 후에도 반환된 객체의 값을 읽을 수 있도록 expire_on_commit=False
+    """
+    def call():
+        with Session(engine, expire_on_commit=False) as session:
+            return fn(session, *args, **kwargs)
+    return await asyncio.to_thread(call)
+
+def save(session, *objects):
+    """run_db 용: 세션 밖에서 수정한 객체(detached)/새 객체 저장"""
+    for obj in objects:
+        session.merge(obj)
+    session.commit()
+
+def update_row(session, model, row_id, **values):
+    """run_db 용: 지정한 컬럼만 UPDATE (다른 곳에서 바뀐 컬럼은 덮어쓰지 않음)"""
+    session.exec(update(model).where(model.id == row_id).values(**values))
+    session.commit()
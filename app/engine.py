@@ -1,35 +1,161 @@
 import asyncio
-import json
+import html
 import re
-from playwright.async_api import async_playwright, Page, BrowserContext
-from sqlmodel import Session, select
-from app.models import Account, Task, Log
-from app.database import engine as db_engine
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from sqlmodel import select, func
+from app.models import Account, Task, TaskRun, RunSpan, PostedArticle
+from app.metrics import metrics
+from app.events import bus
+from app.session_cache import session_is_fresh
+from app.database import run_db, save, update_row
 from app.config import settings  # 파일 상단으로 이동
+from app.browser_pool import BrowserContextPool
+from app.log_sink import LogSink
+from app.resource_block import ResourceBlocker
+from app.artifacts import artifacts
+from app.retry import TRANSIENT, PERMANENT
+from app.cafe_menu import (
+    wants_board, vanity_name, menu_api_url, gate_api_url, parse_menus, parse_club_id,
+    cached_menus, store_menus, find_menu, suggest,
+)
+from app.cafe import (
+    cafe_key, parse_cafe_ids, parse_article_id, article_url, write_url, is_article_create, is_article_delete,
+)
+from app import selector_memo
+
+
+class _PlaywrightNotLoaded(Exception):
+    pass
+
+
+# playwright.async_api 는 서버 시작을 느리게 하므로 브라우저가 처음 필요할 때 import (_start_browser)
+# 그 전에는 Playwright 타임아웃이 날 수 없으므로 아무것도 잡지 않는 자리표시 클래스
+PlaywrightTimeoutError = _PlaywrightNotLoaded
+
+# 글쓰기 버튼 후보 (정확한 것 우선)
+# Removed dangerous generic get_by_text("글쓰기") that matches popups/memos
+WRITE_SELECTORS = [
+    "#cafe-info-data .btn_cafe_writing", # Sidebar (Most reliable)
+    "#write-btn",
+    ".btn_writing",
+    "a[href*='TitleIn.nhn']", # Legacy write link
+    "a:has-text('글쓰기')",
+    "button:has-text('글쓰기')",
+]
+
+# 네이버 메인의 로그인 버튼 (보이면 로그아웃 상태)
+LOGIN_BUTTON_SELECTOR = ".gnb_btn_login, #gnb_login_button, #account .link_login"
+# 카페 페이지에서 로그아웃 상태 표시 (로그인 버튼/링크)
+LOGGED_OUT_SELECTOR = LOGIN_BUTTON_SELECTOR + ", a[href*='nidlogin.login']"
+
+# 제목/본문/등록 버튼 후보 (key는 셀렉터 기억(selector_memo)에 저장되는 이름)
+TITLE_SELECTORS = [
+    "textarea[placeholder*='제목']",
+    "input[placeholder*='제목']",
+    "placeholder=제목을 입력해 주세요",
+    ".textarea_input",
+    "#subject",
+]
+CONTENT_SELECTORS = [
+    ".se-main-container .se-content",
+    ".se-text-paragraph",
+    "[contenteditable='true']",
+]
+SUBMIT_SELECTORS = [
+    "button.btn_register", # Standard SE One
+    "a.btn_register",
+    "button:has-text('등록')",
+    "#btn_submit", # Legacy
+]
+# 게시글 화면의 삭제 버튼
+DELETE_SELECTORS = [
+    "button:has-text('삭제')",
+    "a:has-text('삭제')",
+]
+# 삭제 확인 레이어 (브라우저 confirm 대화상자가 아닌 경우)
+DELETE_CONFIRM_SELECTOR = "[role='dialog'] button:has-text('확인'), .LayerPopup button:has-text('확인')"
+
+# HTML 본문을 붙여넣기(paste) 이벤트로 전달 -> 에디터가 서식을 변환
+# 에디터가 처리하지 않으면(defaultPrevented 아님) execCommand('insertHTML')
+PASTE_HTML_JS = """(el, html) => {
+    el = el || document.activeElement;
+    if (!el) return false;
+    el.focus();
+    const data = new DataTransfer();
+    data.setData('text/html', html);
+    data.setData('text/plain', el.ownerDocument.createRange().createContextualFragment(html).textContent);
+    const event = new ClipboardEvent('paste', { clipboardData: data, bubbles: true, cancelable: true });
+    el.dispatchEvent(event);
+    if (event.defaultPrevented) return true;
+    return el.ownerDocument.execCommand('insertHTML', false, html);
+}"""
+
+# 입력 후 본문 글자 수 (문단 하나가 아니라 에디터 전체 기준)
+EDITOR_TEXT_JS = """(el) => (el.closest('.se-main-container') || el.closest('[contenteditable="true"]') || el).innerText"""
+
+# 에디터 준비 완료 신호 (제목 또는 본문 입력 영역)
+EDITOR_READY_SELECTOR = "textarea[placeholder*='제목'], input[placeholder*='제목'], .se-main-container, #subject"
+
+class RunState:
+    """실행 중인 run 하나의 상태 (로그 수, 현재 단계, 단계별 소요 시간)"""
+
+    def __init__(self, run_id, task_id, cafe):
+        self.run_id = run_id
+        self.task_id = task_id
+        self.cafe = cafe
+        self.steps = 0
+        self.phase = None
+        self.phase_started = None  # (perf_counter, datetime)
+        self.spans = []
+        self.error_kind = None  # 실패 종류 (지정하지 않은 실패는 transient)
 
 class AutomationEngine:
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, interactive=None):
         self.headless = headless
+        # 지켜보기 모드: 단계 사이 지연 + 결과/실패 화면 유지 (기본은 빠른 모드)
+        self.interactive = settings.INTERACTIVE_MODE if interactive is None else interactive
         self.playwright = None
-        self.browser = None  # CDP 연결 시 사용
-        self.context = None
+        self.browser = None  # 공유 브라우저 (CDP 연결 또는 새로 실행)
+        self.over_cdp = False  # 사용자의 크롬에 CDP 로 연결했는지
+        self.context = None  # 대시보드 창 전용
+        self.pool = BrowserContextPool(self, max_size=settings.BROWSER_POOL_SIZE)
+        self._runs = {}  # task_id -> RunState (실행 중인 run)
+        self._browser_lock = asyncio.Lock()
+        # 사전 준비(prewarm) 상태: cold / warming / ready / failed
+        self.warm_state = "cold"
+        self.warm_error = None
+        self.logs = LogSink(
+            batch_size=settings.LOG_BATCH_SIZE,
+            flush_interval=settings.LOG_FLUSH_INTERVAL_SEC,
+            flush_terminal=settings.LOG_FLUSH_TERMINAL,
+        )
 
-    async def get_browser_context(self):
+    async def get_browser(self):
         """
-        브라우저 컨텍스트 가져오기
-        1. 기존 컨텍스트가 있으면 재사용
+        공유 브라우저(Chromium 프로세스 하나) 가져오기
+        1. 이미 연결된 브라우저가 있으면 재사용
         2. CDP로 기존 크롬 브라우저에 연결 시도
-        3. 실패 시 새 브라우저 창 생성
+        3. 실패 시 새 브라우저 실행
+        계정별 컨텍스트는 self.pool 에서 이 브라우저 위에 생성됨
         """
-        if self.context:
-            try:
-                # 기존 컨텍스트가 유효한지 확인
-                _ = self.context.pages 
-                return self.context
-            except Exception:
-                print("Context deemed disconnected, restarting...")
-                self.browser = None
-                self.context = None
+        if self.browser and self.browser.is_connected():
+            return self.browser
+        # 사전 준비와 첫 실행이 동시에 불러도 브라우저는 한 번만 실행
+        async with self._browser_lock:
+            if self.browser and self.browser.is_connected():
+                return self.browser
+            return await self._start_browser()
+
+    async def _start_browser(self):
+        global PlaywrightTimeoutError
+        self._reset_browser()
+        if not self.playwright:
+            print(f"[DEBUG] Starting playwright...")
+            from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+            self.playwright = await async_playwright().start()
+            print(f"[DEBUG] Playwright started successfully")
 
         # 1단계: CDP로 기존 크롬 브라우저에 연결 시도
         cdp_port = settings.CHROME_CDP_PORT
@@ -41,21 +167,11 @@ class AutomationEngine:
             
             try:
                 print(f"🔗 Attempting to connect to existing Chrome via CDP: {cdp_url}")
-                self.playwright = await async_playwright().start()
-                
-                # CDP 엔드포인트로 연결
                 self.browser = await self.playwright.chromium.connect_over_cdp(cdp_url)
-                
-                # 기본 컨텍스트 가져오기 (CDP는 항상 기본 컨텍스트가 있음)
-                if self.browser.contexts:
-                    self.context = self.browser.contexts[0]
-                else:
-                    # 만약 컨텍스트가 없다면 에러 발생 (CDP에서는 거의 없는 경우)
-                    raise Exception("No default context found in CDP browser")
-                
+                self.over_cdp = True
+                self.browser.on("disconnected", lambda _: self._reset_browser())
                 print("✅ Successfully connected to existing Chrome browser!")
-                print(f"📑 Current tabs: {len(self.context.pages)}")
-                return self.context
+                return self.browser
                 
             except Exception as e:
                 print(f"⚠️ CDP connection failed: {e}")
@@ -63,27 +179,119 @@ class AutomationEngine:
         else:
             print("ℹ️ CDP port not configured, using default browser launch mode...")
             
-        # 2단계: CDP 비활성화 또는 실패 시 기존 방식(새 창) 사용
-        import os
-        user_data_dir = os.path.abspath("./user_data")
-        
-        print(f"[DEBUG] Starting playwright...")
-        self.playwright = await async_playwright().start()
-        print(f"[DEBUG] Playwright started successfully")
-        
-        print(f"🚀 Launching persistent context: {user_data_dir}")
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir,
+        # 2단계: CDP 비활성화 또는 실패 시 새 브라우저 실행
+        print(f"🚀 Launching shared browser (headless={self.headless})")
+        self.browser = await self.playwright.chromium.launch(
             headless=self.headless,
             # channel="chrome", # REMOVED: Causing crashes on some systems
             args=[
                 "--disable-web-security",
                 "--no-sandbox",
                 "--disable-blink-features=AutomationControlled"
-            ],
-            viewport={"width": 1280, "height": 800}
+            ]
         )
-        print(f"[DEBUG] Browser context created successfully")
+        self.browser.on("disconnected", lambda _: self._reset_browser())
+        print(f"[DEBUG] Browser launched successfully")
+        return self.browser
+
+    async def prewarm(self, shard=None):
+        """
+        서버 시작 시 백그라운드로 브라우저 실행(또는 CDP 연결) + 곧 실행될 계정들의 컨텍스트 생성
+        -> 첫 실행이 브라우저 콜드 스타트 비용을 내지 않음 (상태는 warm_state, /ready 에서 확인)
+        shard=(index, count): 워커 프로세스는 자기 몫의 계정만
+        """
+        self.warm_state = "warming"
+        started = time.perf_counter()
+        try:
+            await self.get_browser()
+            accounts = await run_db(self._upcoming_accounts, self.pool.max_size, shard)
+            await self.pool.prewarm(accounts)
+        except Exception as e:
+            self.warm_state = "failed"
+            self.warm_error = str(e)
+            print(f"⚠️ Browser pre-warm failed (first run will launch it): {e}")
+            return
+        self.warm_state = "ready"
+        self.warm_error = None
+        print(f"🔥 Browser pre-warmed in {time.perf_counter() - started:.1f}s ({len(accounts)} account contexts)")
+
+    def _upcoming_accounts(self, session, limit, shard=None):
+        """(run_db) 작업이 있는 계정을 다음 실행 예정 순으로 (스케줄 없는 계정은 뒤로)"""
+        next_run = func.min(Task.next_run_at)
+        query = select(Account).join(Task, Task.account_id == Account.id)
+        if shard:
+            index, count = shard
+            query = query.where(Account.id % count == index)
+        return session.exec(
+            query.group_by(Account.id).order_by(next_run.is_(None), next_run).limit(limit)
+        ).all()
+
+    def readiness(self):
+        browser_ready = bool(self.browser and self.browser.is_connected())
+        return {
+            "browser": "ready" if browser_ready else self.warm_state,
+            "warm_state": self.warm_state,
+            "error": self.warm_error,
+            "contexts": self.pool.size,
+            "pool_size": self.pool.max_size,
+        }
+
+    def _reset_browser(self):
+        """브라우저 연결이 끊기면 브라우저/대시보드/풀 상태를 모두 초기화"""
+        self.browser = None
+        self.over_cdp = False
+        self.context = None
+        self.pool.clear()
+
+    async def close(self):
+        """
+        종료 시 정리: 풀의 계정 컨텍스트 -> 브라우저 -> Playwright 드라이버
+        (드라이버를 그대로 두고 프로세스가 끝나면 node 드라이버가 EPIPE 로 죽음)
+        CDP 로 연결한 사용자 크롬은 닫지 않고 연결만 끊음
+        """
+        await self.pool.close()
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+        if self.playwright:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+        self.playwright = None
+        self._reset_browser()
+
+    def _forget_dashboard(self, context):
+        if self.context is context:
+            self.context = None
+
+    async def get_browser_context(self):
+        """
+        대시보드("Pro Browser") 창용 컨텍스트
+        - CDP 연결 시: 사용자의 기본 컨텍스트
+        - 그 외: 공유 브라우저의 별도 컨텍스트 (풀에 넣지 않음)
+        자동화 실행은 이 컨텍스트를 쓰지 않고 self.pool 의 계정별 컨텍스트를 사용
+        (실행 모드에서 browser.contexts[0] 은 풀의 계정 컨텍스트일 수 있으므로 쓰지 않음)
+        """
+        if self.context:
+            try:
+                # 기존 컨텍스트가 유효한지 확인
+                _ = self.context.pages 
+                return self.context
+            except Exception:
+                print("Context deemed disconnected, restarting...")
+                self.context = None
+
+        browser = await self.get_browser()
+        if self.over_cdp and browser.contexts:
+            self.context = browser.contexts[0]
+        else:
+            self.context = await browser.new_context(viewport={"width": 1280, "height": 800})
+            context = self.context
+            context.on("close", lambda _: self._forget_dashboard(context))
+        print(f"📑 Current tabs: {len(self.context.pages)}")
         return self.context
 
     async def open_dashboard(self, url="http://127.0.0.1:8000"):
@@ -94,399 +302,916 @@ class AutomationEngine:
             await page.bring_to_front()
         except Exception as e:
             print(f"Error opening dashboard: {e}")
-            self.browser = None
             self.context = None # Force reset on error
             
     async def run_task(self, task_id: int):
+        """
+        Executes a pull-up task:
+        1. Lease this account's context from the pool (isolated cookies/tabs)
+        2. Write New Post
+        """
         print(f"[DEBUG] run_task called with task_id: {task_id}")
+        # DB 는 필요할 때만 스레드에서 짧게 사용 (실행 내내 세션을 잡고 있지 않음)
+        task, account, run = await run_db(self._start_run, task_id)
+        if not task:
+            print(f"Task {task_id} not found")
+            return "FAILED"
+        if not account:
+            self._log(task_id, "FAILED", "Account not found")
+            return "FAILED"
+
+        state = self._runs[task_id] = RunState(run.id, task_id, cafe_key(task.cafe_url))
+        bus.publish("run", task_id, {"run_id": run.id, "status": "RUNNING"})
+
+        status = "FAILED"
+        blocker = None
         try:
-            print(f"[DEBUG] Getting browser context...")
-            context = await self.get_browser_context()
-            print(f"[DEBUG] Browser context obtained: {context}")
-            try:
-                page = context.pages[0] if context.pages else await context.new_page()
-                print(f"[DEBUG] Page obtained: {page.url if hasattr(page, 'url') else 'new page'}")
-            except Exception:
-                # Retry once if new_page fails (zombie context)
-                print("Zombie context detected in run_task, Retrying...")
-                self.browser = None
-                self.context = None
-                context = await self.get_browser_context()
-                page = context.pages[0] if context.pages else await context.new_page()
+            blocker = ResourceBlocker(task.resource_profile)
+            async with self.pool.lease(account) as context:
+                async with blocker.installed(context), \
+                        artifacts.tracing(context, run.id, task_id, enabled=settings.RUN_TRACE) as trace:
+                    status = await self._run_pullup(task, account, context)
+                    trace.failed = status != "SUCCESS"
         except Exception as e:
             print(f"Critical Browser Error: {e}")
             import traceback
             traceback.print_exc()  # 전체 스택 트레이스 출력
-            self.browser = None
-            self.context = None
-            return # Let background task fail gracefully
-            
-        """
-        Executes a pull-up task:
-        1. Reuse existing window if available
-        2. Write New Post
-        """
-        with Session(db_engine) as session:
-            task = session.get(Task, task_id)
-            if not task:
-                print(f"Task {task_id} not found")
-                return
+            self._log(task_id, "FAILED", f"Browser error: {str(e)}")
+        finally:
+            self._runs.pop(task_id, None)
+            failed_phase = state.phase
+            self._close_phase(state, ok=(status == "SUCCESS"))
+            run.status = status
+            run.finished_at = datetime.now()
+            run.step_count = state.steps
+            # 성공이면 등록 직전에 남긴 permanent 표시(_mark_submit_clicked)도 지움
+            run.error_kind = None if status == "SUCCESS" else state.error_kind or TRANSIENT
+            if blocker and blocker.blocked_requests:
+                run.blocked_requests = blocker.blocked_requests
+                run.blocked_bytes = blocker.blocked_bytes
+                self._log(task_id, "INFO", f"Resource profile '{blocker.profile}' blocked {run.blocked_requests} requests (~{run.blocked_bytes // 1024} KB)")
+            await run_db(save, run, *state.spans)
 
-            account = task.account
-            if not account:
-                self._log(session, task_id, "FAILED", "Account not found")
-                return
+            for span in state.spans:
+                metrics.observe_phase(span.phase, span.cafe_key, span.duration_ms / 1000)
+            if blocker:
+                for resource_type, count in blocker.blocked.items():
+                    metrics.record_blocked(resource_type, count, blocker.bytes_saved[resource_type])
+            metrics.record_run(status, failed_phase if status != "SUCCESS" else None)
+            bus.publish("run", task_id, {"run_id": run.id, "status": status, "steps": run.step_count})
+        return status
 
-            # Use Persistent/Shared Context
-            context = await self.get_browser_context()
-            if context:
-                # FAILSAFE: Inject cookies from DB if available
-                # This ensures login persists even if browser profile is cleared/buggy
-                if account.cookies_json and len(account.cookies_json) > 10:
-                    try:
-                        cookies = json.loads(account.cookies_json)
-                        # Ensure secure flag is handled if running local http
-                        await context.add_cookies(cookies)
-                        self._log(session, task_id, "INFO", "Restored login session from saved datebase cookies.")
-                    except Exception as e:
-                        print(f"Cookie restore warning: {e}")
+    def _start_run(self, session, task_id):
+        """(run_db) Task/Account 조회 + 실행 요약(TaskRun) 생성 -> (task, account, run)"""
+        selector_memo.preload()
+        task = session.get(Task, task_id)
+        if not task:
+            return None, None, None
+        account = task.account
+        if not account:
+            return task, None, None
+        # 실행 요약 (히스토리 조회는 Log 대신 TaskRun 사용)
+        run = TaskRun(task_id=task_id)
+        session.add(run)
+        session.commit()
+        return task, account, run
 
-                # Use the first open page or create new one
-                page = context.pages[0] if context.pages else await context.new_page()
+    async def _run_pullup(self, task, account, context):
+        """Returns the final status ("SUCCESS" / "FAILED")"""
+        task_id = task.id
+        cafe = cafe_key(task.cafe_url)
+        result = "FAILED"
+
+        # 계정 전용 컨텍스트에서 이번 실행용 새 탭을 엶 (다른 실행과 탭을 공유하지 않음)
+        page = await context.new_page()
+        try:
+            await page.bring_to_front()
+        except: pass
+        
+        try:
+            # 1. Ensure Login
+            self._enter_phase(task_id, "login_check")
+            fresh, reason = session_is_fresh(account, await context.cookies("https://www.naver.com"))
+            login_checked = not fresh
+            if fresh:
+                self._log(task_id, "INFO", "Login session verified recently. Skipping naver.com check.")
+            else:
+                self._log(task_id, "INFO", f"Checking login on naver.com ({reason})")
+                if not await self._ensure_login(task_id, account, context, page):
+                    return result
+            
+            # 2. Open Editor: write page URL directly when clubid/menuid are known
+            self._enter_phase(task_id, "navigation")
+            if not await self._resolve_board(task, context):
+                return result
+            editor_page = await self._open_write_page(task, page)
+            if editor_page is None:
+                # Fallback: 게시판 이동 -> 글쓰기 버튼 클릭
+                editor_page = await self._open_editor_via_board(task, account, context, page, login_checked)
+                if editor_page is None:
+                    return result
+
+            # Wait for Editor (SmartEditor One or 2.0)
+            self._log(task_id, "RUNNING", "Waiting for editor to load...")
+            
+            submit_clicked = False
+            try:
+                target_page = editor_page
+                await target_page.wait_for_load_state("domcontentloaded")
                 try:
-                    await page.bring_to_front()
-                except: pass
+                    # 에디터 입력 영역이 실제로 나타날 때까지 대기 (구형 에디터는 iframe 안이라 실패할 수 있음)
+                    await target_page.locator(EDITOR_READY_SELECTOR).first.wait_for(
+                        state="visible", timeout=settings.STEP_TIMEOUT_MS
+                    )
+                except PlaywrightTimeoutError:
+                    self._log(task_id, "WARNING", "Editor fields not visible on page, trying fallbacks...")
                 
-                try:
-                    # 1. Ensure Login
-                    await page.goto("https://www.naver.com")
-                    await page.wait_for_load_state("domcontentloaded")
-                    
-                    # Check for login button (means we are NOT logged in)
-                    # Naver main page usually has a login button with class .gnb_btn_login or id #gnb_login_button
-                    login_btn = page.locator(".gnb_btn_login, #gnb_login_button, #account .link_login").first
-                    if await login_btn.count() > 0 and await login_btn.is_visible():
-                        self._log(session, task_id, "WAITING", "Not logged in. Redirecting to login page...")
-                        await page.goto("https://nid.naver.com/nidlogin.login")
-                        
-                        # Wait for user to login (Poll for success)
-                        self._log(session, task_id, "WAITING", "Please login! Waiting for main page redirect...")
-                        
-                        for _ in range(120): # 2 mins max
-                            if "nid.naver.com" not in page.url and "naver.com" in page.url:
-                                self._log(session, task_id, "INFO", "Login detected!")
-                                break
-                            await asyncio.sleep(1)
-                            
-                        # Double check
-                        if "nid.naver.com" in page.url:
-                             self._log(session, task_id, "FAILED", "Login timeout.")
-                             return 
-                        
-                        # LOGIN SUCCESS: Capture and Save Cookies
-                        try:
-                            # Update account cookies in DB for robustness
-                            current_cookies = await context.cookies()
-                            account.cookies_json = json.dumps(current_cookies)
-                            session.add(account)
-                            session.commit()
-                            self._log(session, task_id, "INFO", "Login successful! Session saved to database.")
-                        except Exception as e:
-                             print(f"Failed to save cookies: {e}")
-                    
-                    target_url = task.cafe_url
-                    
-                    # Force PC Version for reliable automation
-                    # Convert: https://cafe.naver.com/f-e/cafes/31621061/menus/1...
-                    # To: https://cafe.naver.com/ArticleList.nhn?search.clubid=31621061&search.menuid=1
-                    mobile_match = re.search(r"cafe\.naver\.com/f-e/cafes/(\d+)/menus/(\d+)", target_url)
-                    if mobile_match:
-                        club_id = mobile_match.group(1)
-                        menu_id = mobile_match.group(2)
-                        target_url = f"https://cafe.naver.com/ArticleList.nhn?search.clubid={club_id}&search.menuid={menu_id}"
-                        self._log(session, task_id, "INFO", f"Converted Mobile URL to PC URL for stability: {target_url}")
-                    
-                    # 1.5 Navigate to Board (New Logic)
-                    if task.board_name and task.board_name.lower() != "default":
-                         self._log(session, task_id, "RUNNING", f"Navigating to board: {task.board_name}")
-                         try:
-                             # Try to find the menu in the main page (left sidebar usually)
-                             menu = page.locator(f"a:has-text('{task.board_name}')").first
-                             if await menu.count() > 0:
-                                 await menu.click()
-                                 await page.wait_for_timeout(2000) 
-                             else:
-                                 self._log(session, task_id, "WARNING", f"Board '{task.board_name}' not found. Staying on main page.")
-                         except Exception as e:
-                             self._log(session, task_id, "WARNING", f"Error navigating to board: {str(e)}")
-
-                    # 2. Find OLD Post (to be deleted later)
-                    old_post_url = None
-                    if not task.board_name:
-                        await page.goto(target_url)
-                    
-                    # 2. Find Write Button & Click
-                    # Checks for both legacy and modern with a retry/wait loop for manual login
-                    
-                    write_btn = None
-                    main_frame = None
-                    
-                    # Try for up to 60 seconds (user can login manually)
-                    self._log(session, task_id, "WAITING", "Looking for 'Write' button... (Login manually if needed)")
-                    
-                    for i in range(30): # Increased wait to 90s
-                        try:
-                            # 0. Check if we are on the wrong page (Main Naver instead of Cafe)
-                            current_url = page.url
-                            # Allow being on login page without forcing redirect
-                            if "cafe.naver.com" not in current_url and "nid.naver.com" not in current_url and "login" not in current_url:
-                                # We are likely on the login success page or main naver page
-                                # If we see user info or just generic "Login", assumption is we are logged in or need to move
-                                # Force move to target URL to stop waiting on the wrong page
-                                self._log(session, task_id, "INFO", f"Not on Cafe page ({current_url}). forcing navigation to board...")
-                                await page.goto(target_url)
-                                await asyncio.sleep(2)
-                            
-                            # 1. Check Legacy Iframe
-                            iframe_element = await page.query_selector("#cafe_main")
-                            if iframe_element:
-                                main_frame = page.frame_locator("#cafe_main")
-                                write_btn = await main_frame.get_by_text("글쓰기").first.is_visible()
-                                if write_btn:
-                                    write_btn = main_frame.get_by_text("글쓰기").first
-                                    break
-                            
-                            # 2. Check Modern/Mobile DOM
-                            # List of potential write button selectors (Prioritize accurate ones)
-                            write_selectors = [
-                                page.locator("#cafe-info-data .btn_cafe_writing").first, # Sidebar (Most reliable)
-                                page.locator("#write-btn").first,
-                                page.locator(".btn_writing").first,
-                                page.locator("a[href*='TitleIn.nhn']").first, # Legacy write link
-                                page.locator("a:has-text('글쓰기')").first,
-                                page.locator("button:has-text('글쓰기')").first
-                            ] 
-                            
-                            # Removed dangerous generic get_by_text("글쓰기") that matches popups/memos
-                            
-                            for sel in write_selectors:
-                                if await sel.count() > 0 and await sel.is_visible():
-                                    write_btn = sel
-                                    break
-                                    
-                            if write_btn:
-                                break
-                                
-                        except Exception:
-                            pass
-                        
-                        await asyncio.sleep(3)
-                        
-                    if not write_btn:
-                        await page.screenshot(path="debug_write_btn_fail.png")
-                        self._log(session, task_id, "FAILED", "Could not find 'Write' button. Screenshot saved. (Check login/permissions)")
-                        return
-                        
-                    # 3. Write New Post (Handle New Tab)
-                    self._log(session, task_id, "RUNNING", "Found write button, clicking...")
-                    
-                    editor_page = None
+                # Debug: Log frames
+                frames = target_page.frames
+                self._log(task_id, "DEBUG", f"Found {len(frames)} frames.")
+                variant = selector_memo.editor_variant(target_page.url)
+                
+                # 1. Handle TITLE Input
+                self._enter_phase(task_id, "title")
+                title_found = False
+                self._log(task_id, "RUNNING", "Attempting to type title...")
+                
+                # A. Playwright Locators: 페이지 후보 + 각 프레임 안의 제목 칸을 동시에 확인
+                title_candidates = [(sel, self._locator(target_page, sel)) for sel in TITLE_SELECTORS]
+                title_candidates += self._frame_candidates(
+                    target_page, "textarea[placeholder*='제목'], input[placeholder*='제목']"
+                )
+                _, locator = await self._race_visible(
+                    cafe, f"title:{variant}", title_candidates, settings.LOOKUP_TIMEOUT_MS
+                )
+                if locator:
                     try:
-                        # Naver SmartEditor usually opens in a new tab/popup
-                        async with context.expect_page() as new_page_info:
-                            await write_btn.click(timeout=5000)
-                        
-                        editor_page = await new_page_info.value
-                        await editor_page.wait_for_load_state()
-                        self._log(session, task_id, "RUNNING", "Switched to Editor Tab")
-                        
-                    except Exception as e:
-                        self._log(session, task_id, "WARNING", f"New tab detection failed: {e}. Checking open pages...")
-                        # Fallback: Check if a new page exists in context.pages
-                        if len(context.pages) > 1:
-                             editor_page = context.pages[-1]
-                             self._log(session, task_id, "RUNNING", f"Selected last open tab: {editor_page.url}")
-                        else:
-                             editor_page = page
-                             self._log(session, task_id, "WARNING", "No new tab found, using current page.")
-
-                    # Wait for Editor (SmartEditor One or 2.0)
-                    self._log(session, task_id, "RUNNING", "Waiting for editor to load...")
-                    
+                        await target_page.keyboard.press("Escape") 
+                    except: pass
+                    await locator.click(force=True)
+                    await self._pause(settings.WATCH_STEP_DELAY_SEC)
+                    await locator.fill(task.title or task.name)
+                    self._log(task_id, "RUNNING", "Typed Title successfully")
+                    title_found = True
+                
+                # B. JS Fallback (Force Value)
+                if not title_found:
+                    self._log(task_id, "WARNING", "Standard title typing failed. Trying JS injection...")
                     try:
-                        target_page = editor_page
-                        await target_page.wait_for_load_state("domcontentloaded")
-                        
-                        # Debug: Log frames
-                        frames = target_page.frames
-                        self._log(session, task_id, "DEBUG", f"Found {len(frames)} frames.")
-                        
-                        # 1. Handle TITLE Input
-                        title_found = False
-                        self._log(session, task_id, "RUNNING", "Attempting to type title...")
-                        
-                        # A. Playwright Locators
-                        title_candidates = [
-                            target_page.locator("textarea[placeholder*='제목']"), 
-                            target_page.locator("input[placeholder*='제목']"),
-                            target_page.get_by_placeholder("제목을 입력해 주세요"),
-                            target_page.locator(".textarea_input"),
-                            target_page.locator("#subject")
-                        ]
-                        
-                        for locator in title_candidates:
-                            if await locator.count() > 0 and await locator.first.is_visible():
-                                try:
-                                    await target_page.keyboard.press("Escape") 
-                                except: pass
-                                await locator.first.click(force=True)
-                                await asyncio.sleep(0.5)
-                                await locator.first.fill(task.title or task.name)
-                                self._log(session, task_id, "RUNNING", "Typed Title successfully")
-                                title_found = True
-                                break
-                        
-                        # B. JS Fallback (Force Value)
-                        if not title_found:
-                            self._log(session, task_id, "WARNING", "Standard title typing failed. Trying JS injection...")
-                            try:
-                                js_success = await target_page.evaluate("""(text) => {
-                                    const el = document.querySelector('textarea[placeholder*="제목"], input[placeholder*="제목"], .textarea_input');
-                                    if (el) {
-                                        el.value = text;
-                                        el.dispatchEvent(new Event('input', { bubbles: true }));
-                                        return true;
-                                    }
-                                    return false;
-                                }""", task.title or task.name)
-                                if js_success:
-                                    title_found = True
-                                    self._log(session, task_id, "INFO", "Typed Title via JS")
-                            except Exception as e:
-                                self._log(session, task_id, "WARNING", f"JS Title failed: {e}")
-
-                        # C. Frame Fallback
-                        if not title_found:
-                            for f in frames:
-                                try:
-                                    f_loc = f.locator("textarea[placeholder*='제목'], input[placeholder*='제목']")
-                                    if await f_loc.count() > 0:
-                                        await f_loc.first.fill(task.title or task.name)
-                                        title_found = True
-                                        self._log(session, task_id, "RUNNING", "Typed Title in frame")
-                                        break
-                                except: pass
-
-                        await asyncio.sleep(1.0) 
-
-                        # 2. Handle CONTENT Input
-                        content_found = False
-                        self._log(session, task_id, "RUNNING", "Attempting to type content...")
-                        
-                        # A. Playwright Locators (SE One / ContentEditable)
-                        se_content = target_page.locator(".se-main-container .se-content, .se-text-paragraph, [contenteditable='true']").first
-                        
-                        if await se_content.count() > 0:
-                             await se_content.click(force=True)
-                             await asyncio.sleep(0.5)
-                             await target_page.keyboard.type(task.content_html or "Automated Post Content")
-                             self._log(session, task_id, "RUNNING", "Typed Content")
+                        js_success = await target_page.evaluate("""(text) => {
+                            const el = document.querySelector('textarea[placeholder*="제목"], input[placeholder*="제목"], .textarea_input');
+                            if (el) {
+                                el.value = text;
+                                el.dispatchEvent(new Event('input', { bubbles: true }));
+                                return true;
+                            }
+                            return false;
+                        }""", task.title or task.name)
+                        if js_success:
+                            title_found = True
+                            self._log(task_id, "INFO", "Typed Title via JS")
+                    except Exception as e:
+                        self._log(task_id, "WARNING", f"JS Title failed: {e}")
+
+                await self._pause(settings.WATCH_STEP_DELAY_SEC)
+
+                # 2. Handle CONTENT Input
+                self._enter_phase(task_id, "content")
+                content_found = False
+                self._log(task_id, "RUNNING", "Attempting to type content...")
+                
+                # A. Playwright Locators (SE One / ContentEditable + 구형 에디터 iframe 본문) 동시에 확인
+                content_candidates = [(sel, target_page.locator(sel)) for sel in CONTENT_SELECTORS]
+                content_candidates += self._frame_candidates(target_page, "body[contenteditable='true']")
+                _, se_content = await self._race_visible(
+                    cafe, f"content:{variant}", content_candidates, settings.LOOKUP_TIMEOUT_MS
+                )
+                
+                if se_content:
+                     await se_content.click(force=True)
+                     await self._pause(settings.WATCH_STEP_DELAY_SEC)
+                     await self._insert_content(task, target_page, se_content)
+                     self._log(task_id, "RUNNING", "Typed Content")
+                     content_found = True
+                
+                # B. JS Fallback for Content (InnerHTML / TextContent)
+                if not content_found:
+                     self._log(task_id, "WARNING", "Standard content typing failed. Trying JS injection...")
+                     try:
+                         js_valid = await target_page.evaluate("""(html) => {
+                             const el = document.querySelector('.se-main-container .se-content, [contenteditable="true"], body.se2_input_area');
+                             if (el) {
+                                 el.focus();
+                                 el.innerHTML = html; // Direct HTML injection usually works for editors
+                                 el.dispatchEvent(new Event('input', { bubbles: true })); 
+                                 return true;
+                             }
+                             return false;
+                         }""", task.content_html or "Automated Post Content")
+                         
+                         if js_valid:
                              content_found = True
-                        
-                        # B. JS Fallback for Content (InnerHTML / TextContent)
-                        if not content_found:
-                             self._log(session, task_id, "WARNING", "Standard content typing failed. Trying JS injection...")
-                             try:
-                                 js_valid = await target_page.evaluate("""(html) => {
-                                     const el = document.querySelector('.se-main-container .se-content, [contenteditable="true"], body.se2_input_area');
-                                     if (el) {
-                                         el.focus();
-                                         el.innerHTML = html; # Direct HTML injection usually works for editors
-                                         el.dispatchEvent(new Event('input', { bubbles: true })); 
-                                         return true;
-                                     }
-                                     return false;
-                                 }""", task.content_html or "Automated Post Content")
-                                 
-                                 if js_valid:
-                                     content_found = True
-                                     self._log(session, task_id, "INFO", "Typed Content via JS")
-                             except Exception as e:
-                                 self._log(session, task_id, "WARNING", f"JS Content failed: {e}")
-
-                        # C. Frame Fallback
-                        if not content_found:
-                             for f in frames:
-                                 try:
-                                     body = f.locator("body[contenteditable='true']")
-                                     if await body.count() > 0:
-                                         await body.click()
-                                         await asyncio.sleep(0.5)
-                                         await target_page.keyboard.type(task.content_html or "Automated Post Content")
-                                         content_found = True
-                                         break
-                                 except: pass
-                        
-                        await asyncio.sleep(1.0)
-
-                        if not content_found and title_found:
-                             # Last resort: Tab from title
-                             await target_page.keyboard.press("Tab")
-                             await target_page.keyboard.type(task.content_html or "Automated Post Content")
-
-                        # 3. Click SUBMIT "등록"
-                        # Look for Green button at top right
-                        submit_candidates = [
-                            target_page.locator("button.btn_register").first, # Standard SE One
-                            target_page.locator("a.btn_register").first, 
-                            target_page.locator("button:has-text('등록')").first,
-                            target_page.locator("#btn_submit") # Legacy
-                        ]
-                        
-                        submit_btn = None
-                        for btn in submit_candidates:
-                            if await btn.count() > 0 and await btn.is_visible():
-                                submit_btn = btn
-                                break
-                                
-                        if submit_btn:
-                            self._log(session, task_id, "RUNNING", "Found Submit button. Clicking...")
-                            await asyncio.sleep(1.0)
-                            await submit_btn.click(force=True)
-                            self._log(session, task_id, "SUCCESS", "Clicked 'Register'. Post should be live!")
-                        else:
-                            self._log(session, task_id, "WARNING", "Submit button ('등록') not found.")
-                            await target_page.screenshot(path="debug_submit_fail.png")
-
-                        # Wait long enough for user to see the posted result
-                        await asyncio.sleep(15)
+                             self._log(task_id, "INFO", "Typed Content via JS")
+                     except Exception as e:
+                         self._log(task_id, "WARNING", f"JS Content failed: {e}")
+                
+                await self._pause(settings.WATCH_STEP_DELAY_SEC)
 
-                    except Exception as e:
-                        # Dump HTML for debugging
-                        try:
-                            with open("debug_editor.html", "w", encoding="utf-8") as f:
-                                f.write(await target_page.content())
-                        except: pass
+                if not content_found and title_found:
+                     # Last resort: Tab from title
+                     await target_page.keyboard.press("Tab")
+                     await self._insert_content(task, target_page)
+
+                # 3. Click SUBMIT "등록"
+                self._enter_phase(task_id, "submit")
+                # Look for Green button at top right
+                submit_candidates = [(sel, target_page.locator(sel)) for sel in SUBMIT_SELECTORS]
+                _, submit_btn = await self._race_visible(
+                    cafe, f"submit:{variant}", submit_candidates, settings.LOOKUP_TIMEOUT_MS
+                )
                         
-                        await target_page.screenshot(path="debug_editor_fail.png")
-                        self._log(session, task_id, "FAILED", f"Editor failed. HTML dumped. Error: {str(e)}")
-                        await asyncio.sleep(60)
-
-                    # 4. Old Post Deletion (Placeholder)
-                    # Implementation of delete logic...
-                    
-                except Exception as e:
-                    self._log(session, task_id, "FAILED", f"Error during execution: {str(e)}")
-                    # Wait on general error too
-                    await asyncio.sleep(10)
-                finally:
-                    # Do NOT close context provided by get_browser_context
-                    # We want to keep it open for the user
-                    pass
-
-    def _log(self, session, task_id, status, message):
-        log = Log(task_id=task_id, status=status, message=message)
-        session.add(log)
-        session.commit()
+                if submit_btn:
+                    self._log(task_id, "RUNNING", "Found Submit button. Clicking...")
+                    await self._pause(settings.WATCH_STEP_DELAY_SEC)
+                    submit_clicked = True
+                    await self._mark_submit_clicked(task_id)
+                    outcome, article_id, http_status = await self._submit_and_wait(target_page, submit_btn)
+                    if article_id:
+                        await self._record_article(task, article_id)
+                        self._log(task_id, "SUCCESS", f"Posted article {article_id}. Submit confirmed by the server.")
+                        result = "SUCCESS"
+                    elif outcome == "confirmed":
+                        self._log(task_id, "SUCCESS", "Clicked 'Register'. Submit confirmed by the server (article id not captured).")
+                        result = "SUCCESS"
+                    elif outcome == "rejected":
+                        # 서버가 등록을 거절함 (글이 올라가지 않음) -> 재시도해도 중복 게시 위험 없음 (transient)
+                        self._log(task_id, "FAILED", f"Server rejected the post (HTTP {http_status}).")
+                        await self._capture(task_id, target_page, "submit_fail")
+                    else:
+                        self._log(task_id, "FAILED", "Clicked 'Register' but the submit was not confirmed (no response, no article page).")
+                        # 글이 실제로 올라갔을 수 있으므로 재시도하지 않음 (중복 게시 방지)
+                        self._fail_permanently(task_id)
+                        await self._capture(task_id, target_page, "submit_fail")
+                else:
+                    self._log(task_id, "WARNING", "Submit button ('등록') not found.")
+                    await self._capture(task_id, target_page, "submit_fail")
+
+                # 4. Old Post Deletion: 이전 실행에서 올린 글을 글 번호로 바로 삭제 (게시판 검색 없음)
+                # 새 글 번호를 확인했을 때만 (새 글이 실제로 올라갔는지 모르면 이전 글을 지우지 않음)
+                if result == "SUCCESS" and article_id and settings.DELETE_PREVIOUS_POST:
+                    self._enter_phase(task_id, "delete_old")
+                    await self._delete_previous_articles(task, context, keep=article_id)
+
+                # 지켜보기 모드에서만 결과 화면을 잠시 유지 (단계 시간에는 포함하지 않음)
+                if result == "SUCCESS":
+                    self._end_phase(task_id)
+                await self._pause(settings.WATCH_POST_SUBMIT_SEC)
+
+            except Exception as e:
+                # 진단용 스크린샷 + HTML (run 디렉터리에 압축 저장)
+                saved = await self._capture(task_id, target_page, "editor_fail", html=True)
+                self._log(task_id, "FAILED", f"Editor failed. Error: {str(e)}" + (f" (artifacts: {saved})" if saved else ""))
+                result = "FAILED"
+                if submit_clicked:
+                    # 등록 버튼을 누른 뒤라 글이 올라갔을 수 있음 -> 재시도하지 않음 (중복 게시 방지)
+                    self._fail_permanently(task_id)
+                await self._pause(settings.WATCH_EDITOR_FAILURE_SEC)
+            except asyncio.CancelledError:
+                # 서버 종료/리로드로 취소됨 (Exception 이 아니라 위에서 잡히지 않음)
+                if submit_clicked:
+                    self._log(task_id, "FAILED", "Cancelled after clicking 'Register'. Not retrying (the post may exist).")
+                    self._fail_permanently(task_id)
+                raise
+
+        except Exception as e:
+            self._log(task_id, "FAILED", f"Error during execution: {str(e)}")
+            result = "FAILED"
+            # 지켜보기 모드에서만 실패 화면 유지 (빠른 모드는 바로 브라우저 반환)
+            await self._pause(settings.WATCH_FAILURE_SEC)
+        finally:
+            # 컨텍스트는 풀에 남겨 다음 실행에 재사용하고, 이번 실행에서 연 탭만 닫음
+            for p in list(context.pages):
+                try:
+                    await p.close()
+                except: pass
+        return result
+
+    async def _open_editor_via_board(self, task, account, context, page, login_checked):
+        """
+        기존 흐름: 게시판 페이지 이동 -> (게시판 이름 클릭) -> 글쓰기 버튼 -> 에디터
+        에디터 페이지를 반환 (실패 시 None). 지나가면서 clubid/menuid 를 알아내 Task 에 저장
+        """
+        task_id = task.id
+        cafe = cafe_key(task.cafe_url)
+        self._enter_phase(task_id, "navigation")
+        target_url = task.cafe_url
+
+        # Force PC Version for reliable automation
+        # Convert: https://cafe.naver.com/f-e/cafes/31621061/menus/1...
+        # To: https://cafe.naver.com/ArticleList.nhn?search.clubid=31621061&search.menuid=1
+        mobile_match = re.search(r"cafe\.naver\.com/f-e/cafes/(\d+)/menus/(\d+)", target_url)
+        if mobile_match:
+            club_id = mobile_match.group(1)
+            menu_id = mobile_match.group(2)
+            target_url = f"https://cafe.naver.com/ArticleList.nhn?search.clubid={club_id}&search.menuid={menu_id}"
+            self._log(task_id, "INFO", f"Converted Mobile URL to PC URL for stability: {target_url}")
+
+        # 카페 게시판이 아니면 (네이버 메인, 빈 탭, 직접 이동 실패한 글쓰기/로그인 페이지 등) 바로 게시판으로 이동
+        current_url = page.url
+        if "cafe.naver.com" not in current_url or "/articles/write" in current_url:
+            self._log(task_id, "INFO", f"Not on Cafe page ({current_url}). forcing navigation to board...")
+            await page.goto(target_url, wait_until="domcontentloaded")
+
+        # 로그인 확인을 건너뛰었는데 카페가 로그아웃 상태로 보이면 전체 확인 후 다시 이동
+        if not login_checked and await self._looks_logged_out(page):
+            self._log(task_id, "WARNING", "Cafe page shows a logged-out state. Running full login check...")
+            self._enter_phase(task_id, "login_check")
+            account.session_checked_at = None
+            if not await self._ensure_login(task_id, account, context, page):
+                return None
+            self._enter_phase(task_id, "navigation")
+            await page.goto(target_url, wait_until="domcontentloaded")
+
+        # 1.5 Navigate to Board: menuid 를 알면 게시판 URL 로 바로 이동
+        if wants_board(task.board_name) and task.club_id and task.menu_id:
+            board_url = f"https://cafe.naver.com/ArticleList.nhn?search.clubid={task.club_id}&search.menuid={task.menu_id}"
+            self._log(task_id, "RUNNING", f"Opening board '{task.board_name}': {board_url}")
+            await page.goto(board_url, wait_until="domcontentloaded")
+        elif wants_board(task.board_name):
+             # 게시판 목록을 못 가져온 경우에만: 이름이 정확히 같은 링크 클릭
+             self._log(task_id, "RUNNING", f"Navigating to board: {task.board_name}")
+             try:
+                 menu = page.locator(f"a:text-is('{task.board_name}')").first
+                 if await menu.count() > 0:
+                     await menu.click()
+                     await page.wait_for_load_state("domcontentloaded")
+                     await self._pause(settings.WATCH_STEP_DELAY_SEC)
+                 else:
+                     self._log(task_id, "WARNING", f"Board '{task.board_name}' not found. Staying on current page.")
+             except Exception as e:
+                 self._log(task_id, "WARNING", f"Error navigating to board: {str(e)}")
+
+        # 2. Find Write Button & Click
+        # Checks for both legacy and modern, waiting on the selector state instead of polling
+        self._enter_phase(task_id, "write_button")
+        self._log(task_id, "WAITING", "Looking for 'Write' button...")
+        try:
+            write_btn = await self._wait_for_write_button(page, cafe)
+        except PlaywrightTimeoutError:
+            write_btn = None
+
+        if not write_btn:
+            saved = await self._capture(task_id, page, "write_btn_fail")
+            self._log(task_id, "FAILED", "Could not find 'Write' button. (Check login/permissions)" + (f" (artifacts: {saved})" if saved else ""))
+            return None
+
+        # 3. Write New Post (Handle New Tab)
+        self._enter_phase(task_id, "editor_load")
+        self._log(task_id, "RUNNING", "Found write button, clicking...")
+
+        editor_page = await self._open_editor(task_id, context, page, write_btn)
+        await self._remember_cafe_ids(task, editor_page, page)
+        return editor_page
+
+    async def _open_write_page(self, task, page):
+        """
+        clubid/menuid 를 알고 있으면 글쓰기 페이지로 바로 이동 (네이버 메인/게시판/글쓰기 버튼 생략)
+        에디터가 뜨면 page 반환, 모르거나 실패하면 None (기존 흐름으로)
+        """
+        task_id = task.id
+        club_id, menu_id = parse_cafe_ids(task.cafe_url)
+        club_id = club_id or task.club_id
+        # 게시판 이름으로 찾은 menuid 가 URL 의 menuid 보다 우선
+        menu_id = task.menu_id or menu_id
+        if not club_id:
+            return None
+        if not menu_id and wants_board(task.board_name):
+            # 게시판 menuid 를 아직 모름 -> 이번엔 기존 흐름에서 알아냄
+            return None
+
+        url = write_url(club_id, menu_id)
+        self._log(task_id, "RUNNING", f"Opening write page directly: {url}")
+        self._enter_phase(task_id, "editor_load")
+        await page.goto(url, wait_until="domcontentloaded")
+        try:
+            await page.locator(EDITOR_READY_SELECTOR).first.wait_for(state="visible", timeout=settings.STEP_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            self._log(task_id, "WARNING", f"Editor did not open from write URL ({page.url}). Falling back to board navigation...")
+            return None
+        return page
+
+    async def _resolve_board(self, task, context):
+        """
+        board_name -> menuid (카페 게시판 목록 캐시, 없거나 오래됐거나 그 게시판이 없으면 계정 세션으로 다시 조회)
+        새로 가져온 목록에도 그 게시판이 없으면 False (게시판 이름이 바뀌었거나 삭제됨 -> 재시도해도 실패)
+        목록을 가져오지 못하면 True 로 두고 게시판 화면에서 찾는 기존 흐름으로
+        """
+        if not wants_board(task.board_name) or task.menu_id:
+            return True
+        club_id = parse_cafe_ids(task.cafe_url)[0] or task.club_id
+        try:
+            if not club_id and vanity_name(task.cafe_url):
+                club_id = parse_club_id(await self._fetch_json(context, gate_api_url(vanity_name(task.cafe_url))))
+            if not club_id:
+                return True
+            rows = await run_db(cached_menus, club_id)
+            menu_id = find_menu(rows, task.board_name) if rows is not None else None
+            if menu_id is None:
+                # 캐시 이후에 만든 게시판일 수 있으므로 캐시에 없으면 한 번 새로 조회
+                menus = parse_menus(await self._fetch_json(context, menu_api_url(club_id)))
+                if not menus:
+                    return True
+                rows = await asyncio.to_thread(store_menus, club_id, menus)
+                menu_id = find_menu(rows, task.board_name)
+        except Exception as e:
+            self._log(task.id, "WARNING", f"Cafe menu lookup failed ({e}). Looking for the board on the cafe page instead.")
+            return True
+
+        if menu_id is None:
+            self._log(task.id, "FAILED", f"Board '{task.board_name}' not found in cafe {club_id} (boards: {suggest(rows)})")
+            self._fail_permanently(task.id)
+            return False
+        task.club_id, task.menu_id = club_id, menu_id
+        await run_db(update_row, Task, task.id, club_id=club_id, menu_id=menu_id)
+        self._log(task.id, "INFO", f"Board '{task.board_name}' -> menuid {menu_id} (cafe {club_id})")
+        return True
+
+    async def _fetch_json(self, context, url):
+        # 계정 컨텍스트의 쿠키로 요청 (비공개 카페 게시판 목록)
+        response = await context.request.get(
+            url, headers={"Referer": "https://cafe.naver.com/"},
+            timeout=settings.CAFE_MENU_FETCH_TIMEOUT_SEC * 1000,
+        )
+        if not response.ok:
+            raise RuntimeError(f"HTTP {response.status} from {url}")
+        return await response.json()
+
+    async def _remember_cafe_ids(self, task, *pages):
+        """기존 흐름으로 에디터를 연 뒤 clubid/menuid 를 Task 에 저장 (다음 실행부터 직접 이동)"""
+        club_id = menu_id = None
+        for p in pages:
+            found_club, found_menu = parse_cafe_ids(p.url)
+            club_id = club_id or found_club
+            menu_id = menu_id or found_menu
+
+        board_page = pages[-1]
+        try:
+            if not club_id:
+                # 별칭 URL(cafe.naver.com/<name>) 카페: 페이지 스크립트 변수에서 clubid
+                value = await board_page.evaluate("() => window.g_sClubId || null")
+                club_id = int(value) if value else None
+            if not menu_id and wants_board(task.board_name):
+                href = await board_page.locator(f"a[href*='menuid=']:has-text('{task.board_name}')").first.get_attribute("href", timeout=1000)
+                menu_id = parse_cafe_ids(href)[1]
+        except Exception:
+            pass
+
+        if (club_id or task.club_id, menu_id or task.menu_id) == (task.club_id, task.menu_id):
+            return
+        task.club_id = club_id or task.club_id
+        task.menu_id = menu_id or task.menu_id
+        await run_db(update_row, Task, task.id, club_id=task.club_id, menu_id=task.menu_id)
+        self._log(task.id, "INFO", f"Cached cafe ids (clubid={task.club_id}, menuid={task.menu_id}) for direct editor navigation")
+
+    async def _ensure_login(self, task_id, account, context, page):
+        """
+        naver.com 에서 로그인 상태 확인, 로그아웃 상태면 수동 로그인을 기다림
+        성공하면 확인 시각을 계정에 기록하고 True
+        """
+        await page.goto("https://www.naver.com")
+        await page.wait_for_load_state("domcontentloaded")
+        
+        # Check for login button (means we are NOT logged in)
+        # Naver main page usually has a login button with class .gnb_btn_login or id #gnb_login_button
+        login_btn = page.locator(LOGIN_BUTTON_SELECTOR).first
+        if await login_btn.is_visible():
+            self._log(task_id, "WAITING", "Not logged in. Redirecting to login page...")
+            await page.goto("https://nid.naver.com/nidlogin.login")
+            
+            # Wait for user to login (redirect away from nid.naver.com)
+            self._log(task_id, "WAITING", "Please login! Waiting for main page redirect...")
+            
+            try:
+                await page.wait_for_url(
+                    lambda url: "nid.naver.com" not in url and "naver.com" in url,
+                    timeout=settings.LOGIN_TIMEOUT_MS
+                )
+                self._log(task_id, "INFO", "Login detected!")
+            except PlaywrightTimeoutError:
+                 self._log(task_id, "FAILED", "Login timeout.")
+                 # 재시도해도 누군가 로그인하기 전에는 같은 결과
+                 self._fail_permanently(task_id)
+                 return False
+            
+            # LOGIN SUCCESS: Capture and Save Session (cookies + localStorage)
+            try:
+                # Saved right away so a crash later in the run doesn't lose the login
+                await self.pool.save_state(account.id, context)
+                self._log(task_id, "INFO", "Login successful! Session saved to database.")
+            except Exception as e:
+                 print(f"Failed to save session: {e}")
+        
+        # 정상 확인 시각 기록 (다음 실행부터 TTL 동안 이 확인을 건너뜀)
+        account.session_checked_at = datetime.now()
+        await run_db(update_row, Account, account.id, session_checked_at=account.session_checked_at)
+        return True
+
+    async def _looks_logged_out(self, page):
+        """현재 페이지에 로그인 버튼/링크가 보이면 True (요소가 없으면 왕복 1회로 끝남)"""
+        try:
+            return await page.locator(LOGGED_OUT_SELECTOR).first.is_visible()
+        except Exception:
+            return False
+
+    async def verify_session(self, account):
+        """
+        계정 로그인 상태 확인 (대시보드 Verify 버튼, debug_run.py)
+        계정 컨텍스트에서 naver.com 을 열어 로그인 버튼이 없으면 유효
+        """
+        async with self.pool.lease(account) as context:
+            page = await context.new_page()
+            try:
+                await page.goto("https://www.naver.com", wait_until="domcontentloaded")
+                login_btn = page.locator(LOGIN_BUTTON_SELECTOR).first
+                valid = not await login_btn.is_visible()
+            finally:
+                await page.close()
+
+        account.session_checked_at = datetime.now() if valid else None
+        await run_db(update_row, Account, account.id, session_checked_at=account.session_checked_at)
+        return valid
+
+    async def _mark_submit_clicked(self, task_id):
+        """
+        등록 버튼을 누르기 전에 실행 기록을 permanent 로 표시 (프로세스가 여기서 죽으면 재시작 때 다시 실행하지 않음)
+        실행이 끝나면 실제 결과로 덮어씀
+        """
+        state = self._runs.get(task_id)
+        if state:
+            await run_db(update_row, TaskRun, state.run_id, error_kind=PERMANENT)
+
+    def _fail_permanently(self, task_id):
+        """이번 실패는 재시도하지 않도록 표시 (TaskRun.error_kind = permanent)"""
+        state = self._runs.get(task_id)
+        if state:
+            state.error_kind = PERMANENT
+
+    async def _capture(self, task_id, page, name, html=False):
+        """실패 화면 저장 (이 run 의 artifact 디렉터리) -> 디렉터리 또는 None"""
+        state = self._runs.get(task_id)
+        if state is None:
+            return None
+        return await artifacts.capture(page, state.run_id, task_id, name, html=html)
+
+    async def _pause(self, seconds):
+        """지켜보기(interactive) 모드에서만 멈춤. 빠른 모드에서는 바로 다음 단계로"""
+        if self.interactive and seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def _locator(self, page, selector):
+        # "placeholder=..." 후보는 get_by_placeholder 로 변환
+        if selector.startswith("placeholder="):
+            return page.get_by_placeholder(selector[len("placeholder="):])
+        return page.locator(selector)
+
+    def _frame_key(self, frame):
+        # 프레임 기억용 key (쿼리스트링은 실행마다 달라지므로 제외)
+        return "frame:" + (frame.name or urlparse(frame.url).path)
+
+    def _frame_candidates(self, page, selector):
+        """메인 프레임을 제외한 각 프레임 안의 selector -> [(frame key, locator)]"""
+        return [
+            (self._frame_key(frame), frame.locator(selector))
+            for frame in page.frames if frame != page.main_frame
+        ]
+
+    async def _race_visible(self, cafe, slot, candidates, timeout_ms=0):
+        """
+        [(key, locator)] (페이지/프레임 섞여도 됨) 를 동시에 확인해서 보이는 후보 반환
+        -> (key, locator.first) / 없으면 (None, None)
+        1. 모든 후보 is_visible 을 동시에 -> 보이는 것 중 우선순위가 가장 높은 것
+           (이 카페에서 지난번에 성공한 후보, 그다음 목록 순서)
+        2. 없고 timeout_ms 가 있으면 모든 후보가 나타나기를 동시에 기다림 (기한은 전체에 하나)
+        걸리는 시간은 후보별 왕복의 합이 아니라 한 번의 왕복 / 가장 먼저 나타나는 후보
+        결과는 selector_memo 에 기록
+        """
+        ordered = selector_memo.prefer(candidates, selector_memo.recall(cafe, slot))
+        key, loc = await self._first_visible_now(ordered)
+        if key is None and timeout_ms > 0 and ordered:
+            key, loc = await self._first_to_appear(ordered, timeout_ms)
+        if key is not None:
+            selector_memo.remember(cafe, slot, key)
+        return key, loc
+
+    async def _first_visible_now(self, ordered):
+        async def visible(loc):
+            try:
+                # is_visible 은 요소가 없으면 False -> count() 왕복 불필요
+                return await loc.first.is_visible()
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(visible(loc) for _, loc in ordered))
+        for (key, loc), is_visible in zip(ordered, results):
+            if is_visible:
+                return key, loc.first
+        return None, None
+
+    async def _first_to_appear(self, ordered, timeout_ms):
+        waits = {
+            asyncio.ensure_future(loc.first.wait_for(state="visible", timeout=timeout_ms)): (key, loc)
+            for key, loc in ordered
+        }
+        pending = set(waits)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    if waiter.exception() is None:
+                        # 여러 후보가 함께 나타났을 수 있으므로 우선순위대로 한 번 더 (왕복 1회)
+                        key, loc = await self._first_visible_now(ordered)
+                        if key is not None:
+                            return key, loc
+                        key, loc = waits[waiter]
+                        return key, loc.first
+            return None, None
+        finally:
+            for waiter in pending:
+                waiter.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _wait_for_write_button(self, page, cafe):
+        """
+        글쓰기 버튼 (신형 DOM 후보 + 구형 #cafe_main iframe 안의 버튼) 중 먼저 보이는 것
+        시간 내에 나타나지 않으면 None
+        """
+        candidates = [(sel, page.locator(sel)) for sel in WRITE_SELECTORS]
+        candidates.append(("#cafe_main", page.frame_locator("#cafe_main").get_by_text("글쓰기")))
+        _, write_btn = await self._race_visible(cafe, "write", candidates, settings.WRITE_BUTTON_TIMEOUT_MS)
+        return write_btn
+
+    async def _open_editor(self, task_id, context, page, write_btn):
+        """
+        글쓰기 버튼 클릭 후 에디터 페이지 반환
+        새 탭(팝업)이 열리거나 현재 탭이 이동하는 것 중 먼저 오는 신호를 기다림
+        """
+        timeout = settings.STEP_TIMEOUT_MS
+        new_tab = asyncio.ensure_future(context.wait_for_event("page", timeout=timeout))
+        # 광고/통계/#cafe_main 등 하위 프레임 이동은 무시 (현재 탭 자체가 이동할 때만)
+        navigated = asyncio.ensure_future(page.wait_for_event(
+            "framenavigated", predicate=lambda frame: frame == page.main_frame, timeout=timeout
+        ))
+        waiters = {new_tab, navigated}
+        try:
+            await write_btn.click(timeout=5000)
+            done, _ = await asyncio.wait(waiters, timeout=timeout / 1000, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+        # Naver SmartEditor usually opens in a new tab/popup
+        if new_tab in done and not new_tab.exception():
+            editor_page = new_tab.result()
+            await editor_page.wait_for_load_state("domcontentloaded")
+            self._log(task_id, "RUNNING", "Switched to Editor Tab")
+            return editor_page
+
+        # Fallback: Check if a new page exists in context.pages
+        if len(context.pages) > 1:
+            editor_page = context.pages[-1]
+            self._log(task_id, "RUNNING", f"Selected last open tab: {editor_page.url}")
+            return editor_page
+
+        if navigated in done and not navigated.exception():
+            self._log(task_id, "RUNNING", "Editor opened in current tab")
+        else:
+            self._log(task_id, "WARNING", "No new tab found, using current page.")
+        return page
+
+    async def _insert_content(self, task, page, editable=None):
+        """
+        본문 입력 (포커스된 입력 영역에)
+        - 기본(bulk): 한 번에 삽입. content_format=html 이면 붙여넣기로 서식 유지, text 면 insertText
+        - CONTENT_INSERT_MODE=type: 예전처럼 한 글자씩 입력
+        editable 이 주어지면 입력 후 글자 수를 확인하고, 아무것도 들어가지 않았으면 한 글자씩 다시 입력
+        """
+        task_id = task.id
+        content = task.content_html or "Automated Post Content"
+        if settings.CONTENT_INSERT_MODE == "type":
+            await page.keyboard.type(content)
+            return
+
+        fmt = task.content_format or settings.CONTENT_FORMAT
+        if fmt == "html":
+            expected = html.unescape(re.sub(r"<[^>]+>", "", content))
+            if editable is not None:
+                pasted = await editable.evaluate(PASTE_HTML_JS, content)
+            else:
+                pasted = await page.evaluate(f"(html) => ({PASTE_HTML_JS})(null, html)", content)
+            if not pasted:
+                self._log(task_id, "WARNING", "HTML paste was not accepted by the editor. Inserting as text...")
+                await page.keyboard.insert_text(expected)
+        else:
+            expected = content
+            await page.keyboard.insert_text(content)
+
+        if editable is None:
+            return
+        expected_len = len(re.sub(r"\s", "", expected))
+        try:
+            actual_len = len(re.sub(r"\s", "", await editable.evaluate(EDITOR_TEXT_JS)))
+        except Exception as e:
+            self._log(task_id, "WARNING", f"Could not read editor text for length check: {e}")
+            return
+        if actual_len >= expected_len * settings.CONTENT_MIN_RATIO:
+            self._log(task_id, "INFO", f"Inserted content ({actual_len}/{expected_len} chars)")
+        elif actual_len == 0:
+            self._log(task_id, "WARNING", "Bulk insert left the editor empty. Typing content key by key...")
+            await page.keyboard.type(content)
+        else:
+            # 일부만 들어간 경우 다시 입력하면 중복되므로 경고만
+            self._log(task_id, "WARNING", f"Editor holds fewer characters than expected ({actual_len}/{expected_len})")
+
+    async def _submit_and_wait(self, page, submit_btn):
+        """
+        등록 버튼 클릭 후 서버 응답(글 등록 POST) 또는 게시글 페이지 이동을 기다림
+        -> (결과, 새 글 번호 또는 None, 등록 응답 HTTP 상태 또는 None)
+        결과: "confirmed" / "rejected"(등록 POST 가 2xx 가 아님) / "unconfirmed"(응답도 새 글 화면도 없음)
+        """
+        def is_submit_response(response):
+            return is_article_create(response.request.method, response.url)
+
+        try:
+            async with page.expect_response(is_submit_response, timeout=settings.SUBMIT_TIMEOUT_MS) as response_info:
+                await submit_btn.click(force=True)
+            response = await response_info.value
+        except PlaywrightTimeoutError:
+            response = None
+        except Exception:
+            # 등록 직후 에디터 탭이 닫혔거나 새 글 화면으로 이동한 경우는 완료로 간주
+            # (로그인/오류 페이지 등 다른 곳으로 이동한 것은 확인 안 됨 -> 호출한 쪽에서 재시도하지 않음)
+            if page.is_closed():
+                return "confirmed", None, None
+            article_id = parse_article_id(page.url)
+            if article_id is not None and "/articles/write" not in page.url:
+                return "confirmed", article_id, None
+            raise
+
+        if response is not None and not response.ok:
+            return "rejected", None, response.status
+        article_id = await self._article_id_from_response(response) if response else None
+        if article_id is None and not page.is_closed():
+            # 등록 후 새 글 화면으로 이동 (.../articles/123)
+            try:
+                await page.wait_for_url(
+                    lambda url: parse_article_id(url) is not None and "/articles/write" not in url,
+                    timeout=settings.STEP_TIMEOUT_MS if response else settings.SUBMIT_TIMEOUT_MS,
+                )
+                article_id = parse_article_id(page.url)
+            except Exception:
+                pass
+        confirmed = response is not None or article_id is not None
+        return ("confirmed" if confirmed else "unconfirmed"), article_id, response.status if response else None
+
+    async def _article_id_from_response(self, response):
+        """등록 API 응답(JSON)에서 articleId 찾기"""
+        try:
+            data = await response.json()
+        except Exception:
+            return parse_article_id(response.headers.get("location"))
+
+        def find(value):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    if key.lower() == "articleid" and str(item).isdigit():
+                        return int(item)
+                    found = find(item)
+                    if found:
+                        return found
+            elif isinstance(value, list):
+                for item in value:
+                    found = find(item)
+                    if found:
+                        return found
+            return None
+
+        return find(data)
+
+    async def _record_article(self, task, article_id):
+        state = self._runs.get(task.id)
+        club_id = task.club_id or parse_cafe_ids(task.cafe_url)[0]
+        await run_db(save, PostedArticle(
+            task_id=task.id,
+            run_id=state.run_id if state else None,
+            club_id=club_id,
+            article_id=article_id,
+            url=article_url(club_id, article_id) if club_id else None,
+        ))
+
+    async def _delete_previous_articles(self, task, context, keep=None):
+        """이 Task 가 예전에 올린 (아직 삭제 안 된) 글을 글 번호로 삭제. 실패해도 이번 실행은 성공으로 유지"""
+        task_id = task.id
+        articles = await run_db(lambda session: session.exec(
+            select(PostedArticle)
+            .where(PostedArticle.task_id == task_id, PostedArticle.deleted_at == None)  # noqa: E711
+            .order_by(PostedArticle.id)
+        ).all())
+        for article in articles:
+            if article.article_id == keep:
+                continue
+            if not article.url:
+                continue
+            try:
+                deleted = await self._delete_article(task, context, article)
+                article.delete_error = None if deleted else "Delete not confirmed"
+            except Exception as e:
+                deleted = False
+                article.delete_error = str(e)[:500]
+            if deleted:
+                article.deleted_at = datetime.now()
+                self._log(task_id, "INFO", f"Deleted previous article {article.article_id}")
+            else:
+                self._log(task_id, "WARNING", f"Could not delete previous article {article.article_id}: {article.delete_error}")
+            await run_db(save, article)
+
+    async def _delete_article(self, task, context, article):
+        """게시글 화면을 바로 열어 삭제 버튼 클릭 -> 삭제 확인되면 True"""
+        cafe = cafe_key(task.cafe_url)
+        page = await context.new_page()
+        # 삭제 확인(confirm) 대화상자는 자동으로 수락
+        page.on("dialog", lambda dialog: asyncio.ensure_future(dialog.accept()))
+        try:
+            response = await page.goto(article.url, wait_until="domcontentloaded")
+            if response is not None and response.status == 404:
+                return True  # 이미 삭제됨
+
+            legacy = page.frame_locator("#cafe_main")
+            candidates = [(sel, page.locator(sel)) for sel in DELETE_SELECTORS]
+            candidates += [(f"#cafe_main {sel}", legacy.locator(sel)) for sel in DELETE_SELECTORS]
+            _, delete_btn = await self._race_visible(cafe, "delete", candidates, settings.STEP_TIMEOUT_MS)
+            if not delete_btn:
+                return False
+
+            def is_delete_response(response):
+                return is_article_delete(response.request.method, response.url, article.article_id)
+
+            try:
+                async with page.expect_response(is_delete_response, timeout=settings.STEP_TIMEOUT_MS) as response_info:
+                    await delete_btn.click()
+                    # 자체 확인 레이어를 쓰는 화면이면 '확인' 클릭
+                    try:
+                        confirm = page.locator(DELETE_CONFIRM_SELECTOR).first
+                        await confirm.click(timeout=2000)
+                    except Exception:
+                        pass
+                response = await response_info.value
+            except PlaywrightTimeoutError:
+                return False  # 삭제 요청을 확인하지 못함 -> 다음 실행에서 다시 시도
+            return response.ok
+        finally:
+            await page.close()
+
+    def _log(self, task_id, status, message):
+        # 버퍼에만 쌓고 바로 반환 (DB 저장은 LogSink 가 묶어서 처리)
+        log = self.logs.emit(task_id, status, message)
+        bus.publish("log", task_id, {
+            "status": status,
+            "message": message,
+            "timestamp": log.timestamp.isoformat(timespec="seconds"),
+        })
+        state = self._runs.get(task_id)
+        if state:
+            state.steps += 1
+
+    def _enter_phase(self, task_id, phase):
+        """현재 단계 종료 + 새 단계 시작 (단계별 소요 시간 측정용)"""
+        state = self._runs.get(task_id)
+        if not state:
+            return
+        self._close_phase(state)
+        state.phase = phase
+        state.phase_started = (time.perf_counter(), datetime.now())
+
+    def _end_phase(self, task_id):
+        state = self._runs.get(task_id)
+        if state:
+            self._close_phase(state)
+
+    def _close_phase(self, state, ok=True):
+        if state.phase is None:
+            return
+        started, started_at = state.phase_started
+        state.spans.append(RunSpan(
+            run_id=state.run_id,
+            task_id=state.task_id,
+            cafe_key=state.cafe,
+            phase=state.phase,
+            started_at=started_at,
+            duration_ms=int((time.perf_counter() - started) * 1000),
+            ok=ok,
+        ))
+        state.phase = None
 
 actions = AutomationEngine()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from collections import deque
+from datetime import datetime
+
+HEARTBEAT_SEC = 15
+
+
+class EventBus:
+    """
+    실행 상태/로그 실시간 전달 (Server-Sent Events 용)
+    - publish 된 이벤트는 구독자 큐로 바로 전달 (DB 조회 없음)
+    - 최근 history 개는 보관해서 Last-Event-ID 로 이어받기 가능
+    - 이벤트 id 는 서버 프로세스 안에서만 유효 (재시작하면 1부터)
+    - 동기 라우트(스레드풀)에서 publish 해도 이벤트 루프 스레드로 넘겨서 처리
+    """
+
+    def __init__(self, history=1000, subscriber_queue=500):
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._last_id = 0
+        self._queue_size = subscriber_queue
+        self._loop = None
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, event_type, task_id, data):
+        loop = self._loop
+        if loop is not None and not _on_loop(loop):
+            if loop.is_running():
+                loop.call_soon_threadsafe(self._publish, event_type, task_id, data)
+                return None
+        return self._publish(event_type, task_id, data)
+
+    def _publish(self, event_type, task_id, data):
+        self._last_id += 1
+        event = {
+            "id": self._last_id,
+            "type": event_type,
+            "task_id": task_id,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "data": data,
+        }
+        self._history.append(event)
+        for queue, task_ids in list(self._subscribers):
+            if task_ids and task_id not in task_ids:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 너무 느린 구독자는 끊음 (남은 이벤트를 보낸 뒤 종료, 브라우저가 Last-Event-ID 로 다시 연결해서 이어받음)
+                self._subscribers.discard((queue, task_ids))
+        return event
+
+    def replay(self, after_id, task_ids=None):
+        # 이전 서버 프로세스의 id 라면 (현재 id 보다 큼) 보관 중인 것 전부
+        if after_id > self._last_id:
+            after_id = 0
+        return [e for e in self._history if e["id"] > after_id and (not task_ids or e["task_id"] in task_ids)]
+
+    async def subscribe(self, task_ids=None, after_id=None):
+        """이벤트 async generator. 이벤트가 없으면 HEARTBEAT_SEC 마다 None(하트비트)"""
+        task_ids = frozenset(task_ids or ())
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        entry = (queue, task_ids)
+        self._subscribers.add(entry)
+        try:
+            if after_id is not None:
+                for event in self.replay(after_id, task_ids):
+                    yield event
+            while entry in self._subscribers or not queue.empty():
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_SEC)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+        finally:
+            self._subscribers.discard(entry)
+
+
+def _on_loop(loop):
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def format_sse(event):
+    if event is None:
+        return ": ping\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+bus = EventBus()
@@ -0,0 +1,449 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlmodel import Session, select, update, func, or_
+from app.models import Task, TaskRun, Job, Worker
+from app.database import engine as db_engine
+from app.config import settings
+from app.cafe import cafe_key
+from app.schedule import next_run_time
+from app.engine import actions
+from app.events import bus
+from app.retry import TRANSIENT, PERMANENT, CircuitBreaker, backoff_delay
+
+PENDING_STATUSES = ("QUEUED", "RUNNING")
+
+
+class QueueFull(Exception):
+    pass
+
+
+def recover_jobs(session, jobs, reason):
+    """
+    실행 도중 중단된(RUNNING) 작업 정리 (커밋 포함) -> (다시 대기열로 보낸 수, 실패 처리한 수)
+    - 등록 버튼을 누른 뒤 중단된 실행(TaskRun.error_kind = permanent)은 다시 실행하지 않음 (중복 게시 방지)
+    - 재시도 횟수를 다 쓴 작업은 실패 (프로세스를 죽이는 작업이 재시작할 때마다 다시 실행되지 않도록)
+    - 나머지는 백오프 후 다시 대기열로
+    끝나지 않은 실행 기록(RUNNING)은 실패로 마감
+    """
+    now = datetime.now()
+    requeued = failed = 0
+    for job in jobs:
+        task = session.get(Task, job.task_id)
+        max_retries = task.max_retries if task and task.max_retries is not None else settings.RETRY_MAX
+        run = session.exec(
+            select(TaskRun).where(TaskRun.task_id == job.task_id, TaskRun.started_at >= job.started_at)
+            .order_by(TaskRun.id.desc())
+        ).first() if job.started_at else None
+        if run is not None and run.status == "RUNNING":
+            run.status = "FAILED"
+            run.finished_at = now
+            run.error_kind = run.error_kind or TRANSIENT
+            session.add(run)
+
+        if task is None:
+            job.error = f"{reason} (task deleted)"
+        elif run is not None and run.error_kind == PERMANENT:
+            job.error = f"{reason} after submit (not retried)"
+        elif job.attempts > max_retries:
+            job.error = f"{reason} ({job.attempts} attempts)"
+        else:
+            delay = backoff_delay(max(1, job.attempts), settings.RETRY_BASE_SEC, settings.RETRY_MAX_SEC)
+            job.status = "QUEUED"
+            job.run_after = now + timedelta(seconds=delay)
+            requeued += 1
+        if job.status != "QUEUED":
+            job.status = "FAILED"
+            job.finished_at = now
+            failed += 1
+        job.started_at = None
+        job.worker_id = None
+        session.add(job)
+    session.commit()
+    return requeued, failed
+
+
+class JobQueue:
+    """
+    SQLite 기반 작업 큐 + 스케줄러 (FastAPI BackgroundTasks 대체)
+    - 큐에 쌓인 작업은 DB(Job 테이블)에 저장되어 재시작해도 사라지지 않음
+    - 워커 수(workers)만큼만 동시에 브라우저 작업 실행
+    - 카페별 동시 실행 수 제한(cafe_limit)
+    - Task 스케줄(interval/cron)에 따라 자동 등록
+    - 워커 프로세스 모드(worker_id, shard): 같은 DB 큐를 여러 프로세스가 나눠서 처리
+      shard=(index, count) 이면 account_id % count == index 인 작업만 가져감 (계정 컨텍스트가 한 프로세스에 머묾)
+    - 일시적(transient) 실패는 같은 Job 을 백오프 후 다시 대기열로 (Task.max_retries / RETRY_MAX 번까지)
+    - 카페별 회로 차단기: 연속으로 실패하는 카페는 잠시 꺼내지 않음 (다른 카페 작업이 슬롯을 사용)
+    """
+
+    def __init__(self, runner, workers=2, cafe_limit=1, max_depth=100,
+                 poll_interval=5.0, scheduler_tick=30.0, worker_id=None, shard=None):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.cafe_limit = max(1, cafe_limit)
+        self.max_depth = max_depth
+        self.poll_interval = poll_interval
+        self.scheduler_tick = scheduler_tick
+        self.worker_id = worker_id
+        self.shard = shard
+        self.breaker = CircuitBreaker(settings.CIRCUIT_FAILURES, settings.CIRCUIT_OPEN_SEC)
+        self._wakeup = asyncio.Event()
+        # _claim 은 스레드에서 실행되므로 워커끼리 동시에 선점하지 않도록
+        self._claim_lock = threading.Lock()
+        self._loop = None
+        self._tasks = []
+        self._running = False
+        self._run_workers = True
+
+    def _notify(self):
+        # 워커 깨우기 (동기 라우트/스케줄러 스레드에서 호출돼도 안전하게)
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._wakeup.set)
+        else:
+            self._wakeup.set()
+
+    # ---- 등록 ----
+
+    def enqueue(self, session, task, source="manual"):
+        """작업 등록 (이미 대기/실행 중이면 기존 Job 반환, 큐가 가득 차면 QueueFull)"""
+        pending = session.exec(
+            select(Job).where(Job.task_id == task.id, Job.status.in_(PENDING_STATUSES))
+        ).first()
+        if pending:
+            return pending
+
+        depth = session.exec(select(func.count()).select_from(Job).where(Job.status == "QUEUED")).one()
+        if depth >= self.max_depth:
+            raise QueueFull(f"Queue is full ({depth}/{self.max_depth})")
+
+        job = Job(task_id=task.id, cafe_key=cafe_key(task.cafe_url), source=source, account_id=task.account_id)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        bus.publish("job", task.id, {"job_id": job.id, "status": job.status, "source": source})
+        self._notify()
+        return job
+
+    def enqueue_many(self, session, tasks, source="manual"):
+        """
+        여러 작업을 한 번에 등록 (조회 2번 + 커밋 1번)
+        -> {task_id: Job} (이미 대기/실행 중이면 기존 Job, 큐가 가득 차서 못 넣은 작업은 None)
+        """
+        task_ids = [task.id for task in tasks]
+        pending = {
+            job.task_id: job for job in session.exec(
+                select(Job).where(Job.task_id.in_(task_ids), Job.status.in_(PENDING_STATUSES))
+            ).all()
+        }
+        depth = session.exec(select(func.count()).select_from(Job).where(Job.status == "QUEUED")).one()
+
+        results, created = {}, []
+        for task in tasks:
+            if task.id in pending or task.id in results:
+                results[task.id] = pending.get(task.id) or results[task.id]
+                continue
+            if depth >= self.max_depth:
+                results[task.id] = None
+                continue
+            job = Job(task_id=task.id, cafe_key=cafe_key(task.cafe_url), source=source, account_id=task.account_id)
+            session.add(job)
+            created.append(job)
+            results[task.id] = job
+            depth += 1
+        session.commit()
+
+        for job in created:
+            session.refresh(job)
+            bus.publish("job", job.task_id, {"job_id": job.id, "status": job.status, "source": source})
+        if created:
+            self._notify()
+        return results
+
+    def cancel(self, session, job_id):
+        """대기 중인 작업 취소 (실행 중인 작업은 취소 불가)"""
+        result = session.exec(
+            update(Job).where(Job.id == job_id, Job.status == "QUEUED")
+            .values(status="CANCELLED", finished_at=datetime.now())
+        )
+        session.commit()
+        if result.rowcount != 1:
+            return False
+        job = session.get(Job, job_id)
+        bus.publish("job", job.task_id, {"job_id": job_id, "status": "CANCELLED"})
+        return True
+
+    # ---- 상태 ----
+
+    def status(self, session):
+        by_status = dict(session.exec(select(Job.status, func.count()).group_by(Job.status)).all())
+        running_by_cafe = dict(session.exec(
+            select(Job.cafe_key, func.count()).where(Job.status == "RUNNING").group_by(Job.cafe_key)
+        ).all())
+        return {
+            "workers": self.workers,
+            "cafe_limit": self.cafe_limit,
+            "max_depth": self.max_depth,
+            "depth": by_status.get("QUEUED", 0),
+            "running": by_status.get("RUNNING", 0),
+            "by_status": by_status,
+            "running_by_cafe": running_by_cafe,
+            "open_circuits": self.breaker.open_circuits() if self._run_workers else self._worker_circuits(session),
+            "active": self._running,
+        }
+
+    def _worker_circuits(self, session):
+        """
+        워커 프로세스 모드(스케줄러만 실행하는 프로세스): 차단기는 워커 프로세스마다 따로 있으므로
+        각 워커가 하트비트로 남긴 상태를 합침 (하트비트가 끊긴 워커는 제외)
+        """
+        now = datetime.now()
+        circuits = {}
+        for worker in session.exec(select(Worker)).all():
+            elapsed = (now - worker.heartbeat_at).total_seconds()
+            if not worker.circuits_json or elapsed > settings.WORKER_HEARTBEAT_TIMEOUT_SEC:
+                continue
+            for key, remaining in json.loads(worker.circuits_json).items():
+                circuits[key] = max(circuits.get(key, 0.0), round(max(0.0, remaining - elapsed), 1))
+        return circuits
+
+    # ---- 시작/종료 ----
+
+    async def start(self, run_workers=True, run_scheduler=True):
+        """
+        run_workers=False: 스케줄러만 (워커 프로세스 모드의 API 프로세스)
+        run_scheduler=False: 작업 실행만 (worker.py)
+        """
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        await asyncio.to_thread(self._recover)
+        self._running = True
+        self._run_workers = run_workers
+        self._tasks = []
+        if run_workers:
+            self._tasks += [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+            if self.worker_id:
+                self._tasks.append(asyncio.create_task(self._heartbeat()))
+        if run_scheduler:
+            self._tasks.append(asyncio.create_task(self._scheduler()))
+        if run_workers:
+            print(f"📋 Job queue started ({self.workers} workers, {self.cafe_limit}/cafe)")
+        else:
+            print("📋 Job queue started (scheduler only)")
+
+    async def stop(self):
+        self._running = False
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _recover(self):
+        # 서버(워커 프로세스 모드에서는 이 워커)가 실행 도중 종료되었던 작업은 다시 대기열로
+        with Session(db_engine) as session:
+            query = select(Job).where(Job.status == "RUNNING")
+            if self.worker_id:
+                query = query.where(Job.worker_id == self.worker_id)
+            jobs = session.exec(query).all()
+            if not jobs:
+                return
+            requeued, failed = recover_jobs(session, jobs, "Interrupted")
+        print(f"♻️ Re-queued {requeued} interrupted job(s)" + (f", failed {failed}" if failed else ""))
+
+    # ---- 워커 ----
+
+    async def _worker(self, index):
+        while self._running:
+            self._wakeup.clear()
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                # 예: WAL 경합으로 "database is locked" -> 워커를 죽이지 않고 잠시 후 다시
+                print(f"Worker {index} claim error: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, task_id = claimed
+            bus.publish("job", task_id, {"job_id": job_id, "status": "RUNNING"})
+            status, error = "FAILED", None
+            try:
+                status = await self.runner(task_id) or "FAILED"
+            except Exception as e:
+                error = str(e)
+                print(f"Job {job_id} crashed: {e}")
+            job_status, retry_at = await self._finish_safely(index, job_id, status, error)
+            event = {"job_id": job_id, "status": job_status, "error": error}
+            if retry_at:
+                event["retry_at"] = retry_at.isoformat(timespec="seconds")
+            bus.publish("job", task_id, event)
+            # 카페 슬롯이 비었으니 다른 워커도 깨움
+            self._wakeup.set()
+
+    async def _finish_safely(self, index, job_id, status, error):
+        """결과 반영이 DB 오류로 실패하면 잠시 후 다시 (작업이 RUNNING 으로 남지 않도록)"""
+        while True:
+            try:
+                return await asyncio.to_thread(self._finish, job_id, status, error)
+            except Exception as e:
+                print(f"Worker {index} finish error for job {job_id}: {e}")
+                if not self._running:
+                    # 종료 중이면 다음 시작 때 _recover 가 다시 대기열로 보냄
+                    return "RUNNING", None
+                await asyncio.sleep(self.poll_interval)
+
+    def _claim(self):
+        """실행 가능한 작업 하나를 RUNNING으로 바꾸고 (job_id, task_id) 반환"""
+        now = datetime.now()
+        with self._claim_lock, Session(db_engine) as session:
+            if db_engine.dialect.name == "sqlite":
+                # 읽기 전에 쓰기 잠금: 다른 워커 프로세스가 RUNNING 수를 같이 읽고 같은 카페 작업을 동시에 선점하지 못함
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            running = session.exec(select(Job.cafe_key, Job.task_id).where(Job.status == "RUNNING")).all()
+            running_by_cafe = {}
+            for key, _ in running:
+                running_by_cafe[key] = running_by_cafe.get(key, 0) + 1
+            running_tasks = {task_id for _, task_id in running}
+
+            query = select(Job).where(Job.status == "QUEUED", Job.run_after <= now)
+            if self.shard:
+                index, count = self.shard
+                query = query.where(func.coalesce(Job.account_id, 0) % count == index)
+            candidates = session.exec(query.order_by(Job.id).limit(50)).all()
+            for job in candidates:
+                if running_by_cafe.get(job.cafe_key, 0) >= self.cafe_limit:
+                    continue
+                if job.task_id in running_tasks:
+                    continue
+                if not self.breaker.allow(job.cafe_key):
+                    continue
+                # 조건부 UPDATE로 선점 (그 사이 취소됐으면 rowcount 0)
+                result = session.exec(
+                    update(Job).where(Job.id == job.id, Job.status == "QUEUED")
+                    .values(status="RUNNING", started_at=now, worker_id=self.worker_id, attempts=Job.attempts + 1)
+                )
+                if result.rowcount == 1:
+                    session.commit()
+                    self.breaker.on_claim(job.cafe_key)
+                    return job.id, job.task_id
+            session.rollback()
+        return None
+
+    def _finish(self, job_id, status, error=None):
+        """
+        실행 결과 반영 -> (Job 상태, 재시도 시각 또는 None)
+        일시적 실패이고 재시도 횟수가 남았으면 같은 Job 을 run_after 를 미뤄서 다시 QUEUED 로
+        """
+        now = datetime.now()
+        with Session(db_engine) as session:
+            job = session.get(Job, job_id)
+            if not job:
+                return status, None
+            ok = status == "SUCCESS"
+            if self.breaker.record(job.cafe_key, ok):
+                print(f"⛔ Circuit opened for cafe {job.cafe_key}: pausing its jobs for {self.breaker.open_sec:.0f}s")
+
+            retry_at = None
+            if not ok and self._failure_kind(session, job, error) == TRANSIENT:
+                task = session.get(Task, job.task_id)
+                max_retries = task.max_retries if task and task.max_retries is not None else settings.RETRY_MAX
+                if task and job.attempts <= max_retries:
+                    delay = backoff_delay(job.attempts, settings.RETRY_BASE_SEC, settings.RETRY_MAX_SEC)
+                    retry_at = now + timedelta(seconds=delay)
+
+            job.error = error
+            if retry_at:
+                print(f"🔁 Job {job.id} (task {job.task_id}) failed, retry {job.attempts} in {(retry_at - now).total_seconds():.0f}s")
+                job.status = "QUEUED"
+                job.run_after = retry_at
+                job.started_at = None
+                job.worker_id = None
+            else:
+                job.status = status
+                job.finished_at = now
+            session.add(job)
+            session.commit()
+            return job.status, retry_at
+
+    def _failure_kind(self, session, job, error):
+        """이번 실행의 실패 종류 (runner 예외는 transient, 실행 기록이 없으면 permanent)"""
+        if error:
+            return TRANSIENT
+        run = session.exec(
+            select(TaskRun).where(TaskRun.task_id == job.task_id, TaskRun.started_at >= job.started_at)
+            .order_by(TaskRun.id.desc())
+        ).first()
+        if run is None:
+            # Task/계정이 없어서 실행 자체를 못 함
+            return PERMANENT
+        return run.error_kind or TRANSIENT
+
+    async def _heartbeat(self):
+        # 워커 프로세스 생존 신호 (API 프로세스가 멈춘 워커를 찾아 작업을 다시 대기열로 보냄)
+        while self._running:
+            try:
+                await asyncio.to_thread(self._beat)
+            except Exception as e:
+                print(f"Heartbeat error: {e}")
+            await asyncio.sleep(settings.WORKER_HEARTBEAT_SEC)
+
+    def _beat(self):
+        with Session(db_engine) as session:
+            worker = session.get(Worker, self.worker_id)
+            if worker is None or worker.pid != os.getpid():
+                # 새로 시작한 프로세스
+                worker = worker or Worker(name=self.worker_id, pid=os.getpid())
+                worker.pid = os.getpid()
+                worker.started_at = datetime.now()
+            worker.heartbeat_at = datetime.now()
+            worker.circuits_json = json.dumps(self.breaker.open_circuits())
+            session.add(worker)
+            session.commit()
+
+    # ---- 스케줄러 ----
+
+    async def _scheduler(self):
+        while self._running:
+            try:
+                await asyncio.to_thread(self._enqueue_due)
+            except Exception as e:
+                print(f"Scheduler error: {e}")
+            await asyncio.sleep(self.scheduler_tick)
+
+    def _enqueue_due(self):
+        now = datetime.now()
+        with Session(db_engine) as session:
+            scheduled = session.exec(
+                select(Task).where(or_(Task.schedule_interval_minutes != None, Task.schedule_cron != None))  # noqa: E711
+            ).all()
+            for task in scheduled:
+                if task.next_run_at is None:
+                    task.next_run_at = next_run_time(task, now)
+                elif task.next_run_at <= now:
+                    try:
+                        self.enqueue(session, task, source="schedule")
+                    except QueueFull as e:
+                        # 다음 tick에 다시 시도
+                        print(f"Scheduler: {e}, task {task.id} deferred")
+                        continue
+                    task.next_run_at = next_run_time(task, now)
+                session.add(task)
+            session.commit()
+
+
+job_queue = JobQueue(
+    actions.run_task,
+    workers=settings.QUEUE_WORKERS,
+    cafe_limit=settings.QUEUE_CAFE_CONCURRENCY,
+    max_depth=settings.QUEUE_MAX_DEPTH,
+    poll_interval=settings.QUEUE_POLL_SEC,
+    scheduler_tick=settings.SCHEDULER_TICK_SEC,
+)
@@ -0,0 +1,52 @@
+import hashlib
+import json
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import select
+
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fields(fields, allowed, default):
+    """?fields=id,name -> 컬럼 목록 (id 는 커서용으로 항상 포함)"""
+    if not fields:
+        return list(default)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {unknown} (allowed: {', '.join(allowed)})")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+
+def fetch_page(session, model, columns, after=None, limit=200, where=()):
+    """id 순서로 after 다음부터 limit 개 (+다음 페이지 확인용 1개) -> [dict]"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = select(*[getattr(model, c) for c in columns]).where(*where).order_by(model.id).limit(limit + 1)
+    if after is not None:
+        query = query.where(model.id > after)
+    rows = session.exec(query).all()
+    if len(columns) == 1:
+        rows = [(row,) for row in rows]
+    return [dict(zip(columns, row)) for row in rows], limit
+
+
+def list_response(request: Request, items, limit):
+    """
+    목록 응답: 다음 페이지가 있으면 X-Next-Cursor 헤더, ETag 가 If-None-Match 와 같으면 304 (본문 없음)
+    Cache-Control: no-cache -> 브라우저가 매번 ETag 로 재검증
+    """
+    headers = {"Cache-Control": "no-cache"}
+    if len(items) > limit:
+        items = items[:limit]
+        headers["X-Next-Cursor"] = str(items[-1]["id"])
+    body = json.dumps(jsonable_encoder(items), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers["ETag"] = etag
+
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
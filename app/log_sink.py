@@ -0,0 +1,84 @@
+import asyncio
+from sqlmodel import Session
+from app.models import Log
+from app.database import engine as db_engine
+
+TERMINAL_STATUSES = ("SUCCESS", "FAILED")
+
+
+class LogSink:
+    """
+    실행 로그 버퍼
+    - _log 호출은 메모리 버퍼에만 쌓고 바로 반환 (이벤트 루프에서 DB commit/fsync 안 함)
+    - 버퍼가 batch_size 에 도달하거나 flush_interval 이 지나면 한 번의 commit으로 묶어서 저장
+    - flush_terminal=True 이면 SUCCESS/FAILED 는 바로 저장 트리거
+    - 실제 DB 쓰기는 별도 스레드에서 실행
+    """
+
+    def __init__(self, batch_size=50, flush_interval=1.0, flush_terminal=True):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.flush_terminal = flush_terminal
+        self._buffer = []
+        self._wakeup = None
+        self._flusher = None
+        self._write_lock = None
+        self._closing = False
+
+    def emit(self, task_id, status, message):
+        log = Log(task_id=task_id, status=status, message=message)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖(스크립트 등)에서는 바로 저장
+            self._write([log])
+            return log
+
+        self._buffer.append(log)
+        self._ensure_started()
+        if len(self._buffer) >= self.batch_size or (self.flush_terminal and status in TERMINAL_STATUSES):
+            self._wakeup.set()
+        return log
+
+    def _ensure_started(self):
+        if self._flusher is None or self._flusher.done():
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._write_lock = asyncio.Lock()
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        async with self._write_lock:
+            batch, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, batch):
+        try:
+            with Session(db_engine) as session:
+                session.add_all(batch)
+                session.commit()
+        except Exception as e:
+            print(f"Log flush failed ({len(batch)} rows dropped): {e}")
+
+    async def close(self):
+        """남은 로그를 모두 저장하고 종료 (서버 종료 시 호출)"""
+        if self._flusher is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._write(batch)
@@ -0,0 +1,212 @@
+import asyncio
+import uuid
+from datetime import datetime
+from urllib.parse import urlparse
+from sqlmodel import select
+from app.config import settings
+from app.database import run_db, update_row
+from app.events import bus
+from app.models import Account
+from app.engine import actions
+from app.session_cache import AUTH_COOKIES
+from app import storage_state
+
+LOGIN_URL = "https://nid.naver.com/nidlogin.login"
+ACTIVE_STATUSES = ("STARTING", "WAITING")
+
+# 로그인 폼에 입력한 아이디를 알려줌 (naver_id 를 따로 받지 않았을 때 계정 이름으로 사용)
+CAPTURE_ID_JS = """() => {
+    document.addEventListener('change', (e) => {
+        const el = e.target;
+        if (el && el.id === 'id' && el.value && window.__pullupLoginId) window.__pullupLoginId(el.value);
+    }, true);
+}"""
+
+
+class LoginJob:
+    def __init__(self, naver_id=None, account_id=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.naver_id = naver_id
+        self.account_id = account_id  # 기존 계정 재로그인이면 미리 지정
+        self.status = "STARTING"  # STARTING / WAITING / SUCCESS / TIMEOUT / FAILED / CANCELLED
+        self.error = None
+        self.created_at = datetime.now()
+        self.finished_at = None
+        self.task = None
+        self.typed_id = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "account_id": self.account_id,
+            "naver_id": self.naver_id,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(timespec="seconds"),
+            "finished_at": self.finished_at.isoformat(timespec="seconds") if self.finished_at else None,
+        }
+
+
+class LoginJobs:
+    """
+    수동 로그인 작업 (POST /accounts/login 은 바로 job_id 를 돌려주고 로그인은 백그라운드에서)
+    - 새 브라우저를 띄우지 않고 공유 브라우저(풀)의 컨텍스트를 사용
+    - 로그인 완료는 응답 이벤트(Set-Cookie: NID_AUT)로 감지 (주기적인 URL/쿠키 확인 없음)
+    - 로그인 창은 한 번에 하나만 (진행 중이면 그 작업을 돌려줌)
+    - 상태 변경은 이벤트 버스("login")로도 전달
+    - 작업 목록은 메모리에만 보관 (로그인 창은 서버가 재시작되면 어차피 사라짐)
+    """
+
+    def __init__(self, engine, timeout_sec, keep=50):
+        self.engine = engine
+        self.timeout_sec = timeout_sec
+        self.keep = keep
+        self._jobs = {}
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def active(self):
+        return next((job for job in self._jobs.values() if job.status in ACTIVE_STATUSES), None)
+
+    def start(self, naver_id=None, account=None):
+        running = self.active()
+        if running:
+            return running, False
+        job = LoginJob(naver_id=naver_id or (account.naver_id if account else None),
+                       account_id=account.id if account else None)
+        self._jobs[job.id] = job
+        self._trim()
+        job.task = asyncio.create_task(self._run(job, account))
+        self._publish(job)
+        return job, True
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if not job or job.status not in ACTIVE_STATUSES:
+            return False
+        job.task.cancel()
+        return True
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status not in ACTIVE_STATUSES]
+        for job_id in finished[: max(0, len(self._jobs) - self.keep)]:
+            del self._jobs[job_id]
+
+    def _publish(self, job):
+        bus.publish("login", None, job.to_dict())
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now()
+        self._publish(job)
+
+    # ---- 실행 ----
+
+    async def _run(self, job, account):
+        try:
+            if account:
+                # 기존 계정: 풀의 계정 컨텍스트에서 로그인
+                async with self.engine.pool.lease(account) as context:
+                    # 만료된 세션 쿠키가 남아있으면 로그인 페이지가 바로 넘어가거나 잘못 감지됨
+                    await context.clear_cookies()
+                    await self._login(job, context)
+                    # 반납 전에 저장 (그 사이 다른 프로세스가 옛 세션을 저장했더라도 새 로그인이 이김)
+                    await self.engine.pool.save_state(account.id, context)
+                    await run_db(update_row, Account, account.id, session_checked_at=datetime.now())
+            else:
+                context = await self.engine.pool.new_context()
+                adopted = False
+                try:
+                    await self._login(job, context)
+                    job.naver_id = job.naver_id or job.typed_id or f"naver-{job.id}"
+                    state = await context.storage_state()
+                    job.account_id = await run_db(_save_account, job.naver_id)
+                    await asyncio.to_thread(storage_state.save, job.account_id, state)
+                    # 로그인한 컨텍스트를 그대로 계정 컨텍스트로 (같은 계정의 오래된 컨텍스트는 교체)
+                    adopted = await self.engine.pool.adopt(job.account_id, context)
+                finally:
+                    if not adopted:
+                        await _close_quietly(context)
+        except asyncio.CancelledError:
+            self._finish(job, "CANCELLED")
+            return
+        except asyncio.TimeoutError:
+            self._finish(job, "TIMEOUT", f"No login within {self.timeout_sec:.0f}s")
+            return
+        except Exception as e:
+            print(f"Login job {job.id} failed: {e}")
+            self._finish(job, "FAILED", str(e))
+            return
+        print(f"🔑 Login job {job.id}: account {job.account_id} ({job.naver_id}) connected")
+        self._finish(job, "SUCCESS")
+
+    async def _login(self, job, context):
+        """로그인 페이지를 열고 NID_AUT 가 발급될 때까지 대기 (창을 닫으면 실패)"""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def settle(result):
+            if not done.done():
+                done.set_result(result)
+
+        async def check(response):
+            host = urlparse(response.url).hostname or ""
+            if not host.endswith("naver.com"):
+                return
+            try:
+                cookie_header = await response.header_value("set-cookie")
+            except Exception:
+                return
+            if cookie_header and "NID_AUT=" in cookie_header and await _has_auth_cookies(context):
+                settle(True)
+
+        def on_response(response):
+            asyncio.ensure_future(check(response))
+
+        def on_id(value):
+            job.typed_id = (value or "").strip() or job.typed_id
+
+        page = await context.new_page()
+        context.on("response", on_response)
+        page.on("close", lambda _: settle(False))
+        try:
+            await page.expose_function("__pullupLoginId", on_id)
+            await page.add_init_script(f"({CAPTURE_ID_JS})()")
+            await page.goto(LOGIN_URL, wait_until="domcontentloaded")
+            await page.bring_to_front()
+            job.status = "WAITING"
+            self._publish(job)
+            if not await asyncio.wait_for(done, self.timeout_sec):
+                raise RuntimeError("Login window was closed")
+        finally:
+            context.remove_listener("response", on_response)
+            await _close_quietly(page)
+
+
+async def _has_auth_cookies(context):
+    names = {c["name"] for c in await context.cookies("https://www.naver.com")}
+    return all(name in names for name in AUTH_COOKIES)
+
+
+async def _close_quietly(target):
+    try:
+        await target.close()
+    except Exception:
+        pass
+
+
+def _save_account(session, naver_id):
+    """(run_db) 같은 아이디의 계정이 있으면 그 계정을 갱신, 없으면 생성 -> account_id"""
+    account = session.exec(select(Account).where(Account.naver_id == naver_id)).first()
+    if account is None:
+        account = Account(naver_id=naver_id, nickname=naver_id)
+    account.session_checked_at = datetime.now()
+    session.add(account)
+    session.commit()
+    session.refresh(account)
+    return account.id
+
+
+login_jobs = LoginJobs(actions, timeout_sec=settings.LOGIN_TIMEOUT_MS / 1000)
@@ -0,0 +1,113 @@
+from collections import deque
+
+# 단계별 소요 시간 히스토그램 버킷 (초)
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUANTILES = (0.5, 0.95)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _quantile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Metrics:
+    """
+    자동화 실행 지표 (프로세스 메모리, Prometheus 텍스트 포맷으로 출력)
+    - pullup_runs_total{status}
+    - pullup_run_failures_total{phase}       실패한 실행이 마지막으로 있던 단계
+    - pullup_phase_duration_seconds{phase,cafe}  히스토그램
+    - pullup_phase_duration_quantile_seconds{phase,cafe,quantile}  최근 window 개 기준 p50/p95
+    - pullup_blocked_requests_total{type}, pullup_blocked_bytes_estimated_total{type}  리소스 차단
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self.runs = {}
+        self.failures = {}
+        self._histograms = {}  # (phase, cafe) -> [bucket counts..., +Inf, sum]
+        self._recent = {}  # (phase, cafe) -> deque of seconds
+        self.blocked = {}  # resource_type -> [requests, estimated bytes]
+
+    def observe_phase(self, phase, cafe, seconds):
+        key = (phase, cafe)
+        hist = self._histograms.setdefault(key, [0] * (len(BUCKETS) + 2))
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[len(BUCKETS)] += 1
+        hist[len(BUCKETS) + 1] += seconds
+        self._recent.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def record_run(self, status, failed_phase=None):
+        self.runs[status] = self.runs.get(status, 0) + 1
+        if status == "FAILED":
+            phase = failed_phase or "unknown"
+            self.failures[phase] = self.failures.get(phase, 0) + 1
+
+    def record_blocked(self, resource_type, count, estimated_bytes):
+        totals = self.blocked.setdefault(resource_type, [0, 0])
+        totals[0] += count
+        totals[1] += estimated_bytes
+
+    def render(self):
+        lines = [
+            "# HELP pullup_runs_total Automation runs by final status.",
+            "# TYPE pullup_runs_total counter",
+        ]
+        for status, count in sorted(self.runs.items()):
+            lines.append(f"pullup_runs_total{_labels(status=status)} {count}")
+
+        lines += [
+            "# HELP pullup_run_failures_total Failed runs by the phase they failed in.",
+            "# TYPE pullup_run_failures_total counter",
+        ]
+        for phase, count in sorted(self.failures.items()):
+            lines.append(f"pullup_run_failures_total{_labels(phase=phase)} {count}")
+
+        lines += [
+            "# HELP pullup_phase_duration_seconds Time spent in each run phase.",
+            "# TYPE pullup_phase_duration_seconds histogram",
+        ]
+        for (phase, cafe), hist in sorted(self._histograms.items()):
+            for bound, count in zip(BUCKETS, hist):
+                lines.append(f"pullup_phase_duration_seconds_bucket{_labels(phase=phase, cafe=cafe, le=bound)} {count}")
+            count = hist[len(BUCKETS)]
+            lines.append(f"pullup_phase_duration_seconds_bucket{_labels(phase=phase, cafe=cafe, le='+Inf')} {count}")
+            lines.append(f"pullup_phase_duration_seconds_sum{_labels(phase=phase, cafe=cafe)} {hist[len(BUCKETS) + 1]:.6f}")
+            lines.append(f"pullup_phase_duration_seconds_count{_labels(phase=phase, cafe=cafe)} {count}")
+
+        lines += [
+            f"# HELP pullup_phase_duration_quantile_seconds Phase duration quantiles over the last {self.window} samples.",
+            "# TYPE pullup_phase_duration_quantile_seconds gauge",
+        ]
+        for (phase, cafe), recent in sorted(self._recent.items()):
+            for q in QUANTILES:
+                value = _quantile(recent, q)
+                lines.append(f"pullup_phase_duration_quantile_seconds{_labels(phase=phase, cafe=cafe, quantile=q)} {value:.6f}")
+
+        lines += [
+            "# HELP pullup_blocked_requests_total Requests aborted by the resource profile.",
+            "# TYPE pullup_blocked_requests_total counter",
+        ]
+        for resource_type, (count, _) in sorted(self.blocked.items()):
+            lines.append(f"pullup_blocked_requests_total{_labels(type=resource_type)} {count}")
+        lines += [
+            "# HELP pullup_blocked_bytes_estimated_total Estimated bytes not downloaded because of blocking.",
+            "# TYPE pullup_blocked_bytes_estimated_total counter",
+        ]
+        for resource_type, (_, estimated_bytes) in sorted(self.blocked.items()):
+            lines.append(f"pullup_blocked_bytes_estimated_total{_labels(type=resource_type)} {estimated_bytes}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlmodel import Field, SQLModel, Relationship
+from sqlmodel import Field, SQLModel, Relationship, Index
 from datetime import datetime
 import json
 
@@ -9,6 +9,7 @@ class Account(SQLModel, table=True):
     nickname: Optional[str] = None
     cookies_json: str = Field(default="[]") # Store cookies as JSON string
     created_at: datetime = Field(default_factory=datetime.now)
+    session_checked_at: Optional[datetime] = None # Last time the login was confirmed good
     
     tasks: List["Task"] = Relationship(back_populates="account")
 
@@ -20,15 +21,111 @@ class Task(SQLModel, table=True):
     cafe_url: str
     board_name: str # Name of the board to search/post to
     content_html: str
+    content_format: Optional[str] = None # "text" / "html" (비어있으면 CONTENT_FORMAT)
+    # 스케줄 (둘 다 비어있으면 수동 실행만)
+    schedule_interval_minutes: Optional[int] = None
+    schedule_cron: Optional[str] = None # "분 시 일 월 요일" (예: "0 9 * * 1-5")
+    next_run_at: Optional[datetime] = None
+    resource_profile: Optional[str] = None # 리소스 차단 프로필 (비어있으면 RESOURCE_PROFILE)
+    # 글쓰기 페이지 직접 이동용 (실행 중에 알아내서 저장)
+    club_id: Optional[int] = None
+    menu_id: Optional[int] = None
+    max_retries: Optional[int] = None # 일시적 실패 재시도 횟수 (비어있으면 RETRY_MAX)
     
     account: Account = Relationship(back_populates="tasks")
     logs: List["Log"] = Relationship(back_populates="task")
 
 class Log(SQLModel, table=True):
+    # get_task_logs: WHERE task_id = ? ORDER BY timestamp DESC
+    __table_args__ = (Index("ix_log_task_id_timestamp", "task_id", "timestamp"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     task_id: int = Field(foreign_key="task.id")
     status: str # "SUCCESS", "FAILED"
     message: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=datetime.now, index=True) # Used by retention pruning
     
     task: Task = Relationship(back_populates="logs")
+
+class Job(SQLModel, table=True):
+    """Durable run queue entry (survives restarts)"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int = Field(foreign_key="task.id", index=True)
+    cafe_key: str = Field(index=True) # Used for per-cafe concurrency caps
+    status: str = Field(default="QUEUED", index=True) # "QUEUED", "RUNNING", "SUCCESS", "FAILED", "CANCELLED"
+    source: str = Field(default="manual") # "manual", "schedule"
+    run_after: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    account_id: Optional[int] = Field(default=None, index=True) # Worker shard (account affinity)
+    worker_id: Optional[str] = None # Worker process that claimed the job
+    attempts: int = 0 # Times this job has been claimed (retries reuse the same job)
+
+class PostedArticle(SQLModel, table=True):
+    """Article written by a run, so the next run can delete it by id"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int = Field(foreign_key="task.id", index=True)
+    run_id: Optional[int] = None
+    club_id: Optional[int] = None
+    article_id: int
+    url: Optional[str] = None
+    posted_at: datetime = Field(default_factory=datetime.now)
+    deleted_at: Optional[datetime] = None
+    delete_error: Optional[str] = None # Last failed deletion attempt
+
+class Worker(SQLModel, table=True):
+    """Worker process heartbeat (WORKER_PROCESSES mode)"""
+    name: str = Field(primary_key=True) # "worker-0", ...
+    pid: int
+    started_at: datetime = Field(default_factory=datetime.now)
+    heartbeat_at: datetime = Field(default_factory=datetime.now)
+    circuits_json: Optional[str] = None # This worker's open circuits at the last heartbeat ({cafe_key: seconds left})
+
+class SelectorMemo(SQLModel, table=True):
+    """Which selector candidate worked last time, per cafe and lookup slot"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cafe_key: str = Field(index=True)
+    slot: str # e.g. "write", "title:modern", "submit:legacy"
+    selector: str # Candidate key that matched
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class CafeMenu(SQLModel, table=True):
+    """Cached board list of a cafe (board name -> menuid), refreshed after CAFE_MENU_TTL_HOURS"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    club_id: int = Field(index=True)
+    menu_id: int
+    name: str
+    menu_type: Optional[str] = None # "B" = board, "L" = link, ...
+    fetched_at: datetime = Field(default_factory=datetime.now)
+
+class TaskRun(SQLModel, table=True):
+    """One row per run_task call (compact history without scanning Log)"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int = Field(foreign_key="task.id", index=True)
+    status: str = Field(default="RUNNING") # "RUNNING", "SUCCESS", "FAILED"
+    started_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    step_count: int = 0 # Number of log lines written during the run
+    blocked_requests: int = 0 # Requests aborted by the resource profile
+    blocked_bytes: int = 0 # Estimated bytes not downloaded
+    error_kind: Optional[str] = None # "transient" / "permanent" when the run failed
+
+class RunSpan(SQLModel, table=True):
+    """Timing of one phase of a run (login_check, navigation, write_button, ...)"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: int = Field(foreign_key="taskrun.id", index=True)
+    task_id: int = Field(foreign_key="task.id", index=True)
+    cafe_key: str
+    phase: str
+    started_at: datetime
+    duration_ms: int
+    ok: bool = True # False for the phase a failed run ended in
+
+class AccountStorage(SQLModel, table=True):
+    """Playwright storage state (cookies + localStorage) per account, kept out of the Account row"""
+    account_id: int = Field(foreign_key="account.id", primary_key=True)
+    state_json: str = Field(default="{}")
+    state_hash: str = Field(default="")
+    updated_at: datetime = Field(default_factory=datetime.now)
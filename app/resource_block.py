@@ -0,0 +1,114 @@
+import re
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from app.config import settings
+
+# 분석/광고 비콘 (DOM 자동화에는 필요 없음)
+TRACKER_HOSTS = [
+    r"(^|\.)lcs\.naver\.com$",
+    r"(^|\.)nlog\.naver\.com$",
+    r"(^|\.)tivan\.naver\.com$",
+    r"(^|\.)veta\.naver\.com$",
+    r"(^|\.)adcr\.naver\.com$",
+    r"(^|\.)ad\.naver\.com$",
+    r"(^|\.)google-analytics\.com$",
+    r"(^|\.)googletagmanager\.com$",
+    r"(^|\.)doubleclick\.net$",
+    r"(^|\.)facebook\.net$",
+]
+
+# 프로필과 관계없이 절대 차단하지 않는 URL (로그인 페이지/캡차, 스마트에디터 리소스)
+ALLOW_URLS = [
+    r"^https://nid\.naver\.com/",
+    r"captcha",
+    r"^https://[\w.-]*editor[\w.-]*\.(naver\.com|pstatic\.net)/",
+]
+
+# 프로필 이름 -> 차단할 리소스 타입, 트래커 차단 여부
+PROFILES = {
+    "full": {"types": set(), "trackers": False},  # 차단 없음 (라우팅 설치 안 함)
+    "trackers": {"types": set(), "trackers": True},
+    "lite": {"types": {"image", "media", "font"}, "trackers": True},
+}
+
+# 차단한 요청은 실제로 받지 않으므로 절약한 바이트는 리소스 타입별 평균 크기로 추정
+ESTIMATED_BYTES = {"image": 30_000, "media": 300_000, "font": 40_000, "script": 20_000}
+DEFAULT_ESTIMATED_BYTES = 2_000
+
+
+def _patterns(extra):
+    return [p.strip() for p in (extra or "").split(",") if p.strip()]
+
+
+def resolve_profile(name):
+    """Task.resource_profile -> 프로필 이름 (비어있으면 RESOURCE_PROFILE 설정값)"""
+    name = name or settings.RESOURCE_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown resource_profile '{name}' (choose from: {', '.join(PROFILES)})")
+    return name
+
+
+class ResourceBlocker:
+    """
+    실행 동안 컨텍스트에 라우팅 규칙을 걸어 무거운 리소스(이미지/미디어/폰트)와 트래커를 차단
+    차단 건수와 추정 절약 바이트를 리소스 타입별로 집계
+    """
+
+    def __init__(self, profile):
+        self.profile = resolve_profile(profile)
+        rules = PROFILES[self.profile]
+        self.block_types = rules["types"]
+        self.tracker_hosts = [re.compile(p) for p in TRACKER_HOSTS] if rules["trackers"] else []
+        self.block_urls = [re.compile(p) for p in _patterns(settings.RESOURCE_BLOCK_EXTRA)]
+        self.allow_urls = [re.compile(p) for p in ALLOW_URLS + _patterns(settings.RESOURCE_ALLOW_EXTRA)]
+        self.blocked = {}  # resource_type -> count
+        self.bytes_saved = {}  # resource_type -> estimated bytes
+
+    @property
+    def active(self):
+        return bool(self.block_types or self.tracker_hosts or self.block_urls)
+
+    @property
+    def blocked_requests(self):
+        return sum(self.blocked.values())
+
+    @property
+    def blocked_bytes(self):
+        return sum(self.bytes_saved.values())
+
+    def should_block(self, url, resource_type):
+        if any(p.search(url) for p in self.allow_urls):
+            return False
+        if resource_type in self.block_types:
+            return True
+        host = urlparse(url).hostname or ""
+        if any(p.search(host) for p in self.tracker_hosts):
+            return True
+        return any(p.search(url) for p in self.block_urls)
+
+    async def _handle(self, route, request):
+        resource_type = request.resource_type
+        if not self.should_block(request.url, resource_type):
+            # 다른 라우팅(컨텍스트에 먼저 등록된 핸들러)이 있으면 그쪽으로, 없으면 네트워크로
+            await route.fallback()
+            return
+        self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+        self.bytes_saved[resource_type] = (
+            self.bytes_saved.get(resource_type, 0) + ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        )
+        await route.abort("blockedbyclient")
+
+    @asynccontextmanager
+    async def installed(self, context):
+        """lease 받은 컨텍스트에 이번 실행 동안만 라우팅 설치 (컨텍스트는 다른 Task 가 재사용하므로 반드시 해제)"""
+        if not self.active:
+            yield self
+            return
+        await context.route("**/*", self._handle)
+        try:
+            yield self
+        finally:
+            try:
+                await context.unroute("**/*", self._handle)
+            except Exception:
+                pass  # 컨텍스트가 이미 닫힘
@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlmodel import Session, select, delete
+from app.models import Log, TaskRun, RunSpan, Job
+from app.database import engine as db_engine
+from app.config import settings
+
+# 한 번에 지우는 행 수 (긴 쓰기 잠금 방지)
+PRUNE_CHUNK = 5000
+
+
+def _prune_table(model, column, cutoff, extra=None):
+    removed = 0
+    while True:
+        with Session(db_engine) as session:
+            ids = select(model.id).where(column < cutoff)
+            if extra is not None:
+                ids = ids.where(extra)
+            ids = ids.limit(PRUNE_CHUNK)
+            result = session.exec(delete(model).where(model.id.in_(ids)))
+            session.commit()
+        removed += result.rowcount
+        if result.rowcount < PRUNE_CHUNK:
+            return removed
+
+
+def prune(now=None):
+    """보관 기간이 지난 로그/실행 요약/완료된 작업 삭제 (0 이하로 설정하면 해당 항목은 보관)"""
+    now = now or datetime.now()
+    removed = {}
+    if settings.LOG_RETENTION_DAYS > 0:
+        cutoff = now - timedelta(days=settings.LOG_RETENTION_DAYS)
+        removed["log"] = _prune_table(Log, Log.timestamp, cutoff)
+    if settings.RUN_RETENTION_DAYS > 0:
+        cutoff = now - timedelta(days=settings.RUN_RETENTION_DAYS)
+        removed["runspan"] = _prune_table(RunSpan, RunSpan.started_at, cutoff)
+        removed["taskrun"] = _prune_table(TaskRun, TaskRun.started_at, cutoff)
+        removed["job"] = _prune_table(Job, Job.created_at, cutoff, Job.status.not_in(("QUEUED", "RUNNING")))
+    return removed
+
+
+async def retention_loop():
+    """서버 실행 중 주기적으로 prune (DB 작업은 별도 스레드)"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(prune)
+            if any(removed.values()):
+                print(f"🧹 Retention pruned: {removed}")
+        except Exception as e:
+            print(f"Retention error: {e}")
+        await asyncio.sleep(settings.RETENTION_INTERVAL_SEC)
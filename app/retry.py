@@ -0,0 +1,66 @@
+import random
+import time
+
+# 실패 종류 (TaskRun.error_kind)
+# - transient: 다시 하면 될 수 있음 (타임아웃, 페이지 로딩/셀렉터 실패, 브라우저 오류)
+# - permanent: 다시 해도 안 되거나 다시 하면 안 됨 (로그인 필요, 등록 결과 불명 -> 중복 게시 위험)
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+
+def backoff_delay(attempt, base, cap, rng=random):
+    """
+    attempt 번째 실패 후 재시도까지 대기(초): base * 2^(attempt-1), 최대 cap
+    jitter: 그 값의 50~100% 중 무작위 (같은 카페 작업들이 동시에 다시 몰리지 않도록)
+    """
+    delay = min(cap, base * (2 ** max(0, attempt - 1)))
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    카페별 회로 차단기
+    - 같은 카페에서 연속 threshold 번 실패하면 open_sec 동안 그 카페 작업을 꺼내지 않음 (open)
+    - 시간이 지나면 작업 하나만 시험 실행 (half-open): 성공하면 정상, 실패하면 다시 open
+    - 상태는 프로세스 메모리에만 (워커 프로세스 모드에서는 워커마다 따로 판단)
+    """
+
+    def __init__(self, threshold=3, open_sec=300.0, clock=time.monotonic):
+        self.threshold = max(1, threshold)
+        self.open_sec = open_sec
+        self._clock = clock
+        self._failures = {}  # cafe_key -> 연속 실패 수
+        self._open_until = {}  # cafe_key -> clock 값
+        self._probing = set()  # half-open 시험 실행 중인 카페
+
+    def allow(self, key):
+        until = self._open_until.get(key)
+        if until is None:
+            return True
+        if self._clock() < until:
+            return False
+        return key not in self._probing
+
+    def on_claim(self, key):
+        """작업을 꺼냈을 때 (half-open 이면 시험 실행으로 표시)"""
+        if key in self._open_until:
+            self._probing.add(key)
+
+    def record(self, key, ok):
+        """실행 결과 반영 -> 이번 실패로 회로가 열렸으면 True"""
+        probing = key in self._probing
+        self._probing.discard(key)
+        if ok:
+            self._failures.pop(key, None)
+            self._open_until.pop(key, None)
+            return False
+        failures = self._failures[key] = self._failures.get(key, 0) + 1
+        if probing or failures >= self.threshold:
+            self._open_until[key] = self._clock() + self.open_sec
+            return True
+        return False
+
+    def open_circuits(self):
+        """{cafe_key: 남은 초} (half-open 대기 중이면 0)"""
+        now = self._clock()
+        return {key: round(max(0.0, until - now), 1) for key, until in self._open_until.items()}
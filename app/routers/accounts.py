@@ -1,24 +1,116 @@
+import asyncio
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks
-from sqlmodel import Session, select
-from app.database import get_session
-from app.models import Account
-from playwright.async_api import async_playwright
+from sqlmodel import Session, SQLModel, select, delete
+from app.database import get_session, run_db
+from app.models import Account, Task
+from app.routers.tasks import delete_task_rows
+from app.job_queue import job_queue
 from app.engine import actions # Import the engine instance
-import json
-import asyncio
+from app.login_jobs import login_jobs
+from app import storage_state
+from app.listing import parse_fields, fetch_page, list_response
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
+# 목록에 내보내는 컬럼 (로그인 세션/쿠키는 절대 포함하지 않음)
+ACCOUNT_FIELDS = ["id", "naver_id", "nickname", "created_at", "session_checked_at"]
+
 @router.get("/")
-def list_accounts(request: Request, session: Session = Depends(get_session)):
-    accounts = session.exec(select(Account)).all()
-    # In a real app, passing whole objects to template is fine for small scale
-    # But usually we'd validate or serialize.
+def list_accounts(
+    request: Request,
+    after: Optional[int] = None,
+    limit: int = 200,
+    fields: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    columns = parse_fields(fields, ACCOUNT_FIELDS, ACCOUNT_FIELDS)
+    items, limit = fetch_page(session, Account, columns, after, limit)
+    return list_response(request, items, limit)
+
+# ---- Batch endpoints (one validation query, one transaction) ----
+# 계정 생성은 배치로 제공하지 않음: 계정은 로그인 세션이 있어야 쓸 수 있으므로 POST /accounts/login 으로만 만듦
+
+class AccountIds(SQLModel):
+    account_ids: List[int]
+
+class AccountPatch(SQLModel):
+    id: int
+    nickname: Optional[str] = None
+
+def _load_accounts(session, account_ids):
+    """account_ids 를 한 번에 조회, 없는 id 가 있으면 404"""
+    accounts = {a.id: a for a in session.exec(select(Account).where(Account.id.in_(account_ids))).all()}
+    missing = sorted(set(account_ids) - set(accounts))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Accounts not found: {missing}")
     return accounts
 
+@router.patch("/batch")
+def update_accounts(patches: List[AccountPatch], session: Session = Depends(get_session)):
+    accounts = _load_accounts(session, [p.id for p in patches])
+    for patch in patches:
+        for field, value in patch.model_dump(exclude_unset=True, exclude={"id"}).items():
+            setattr(accounts[patch.id], field, value)
+    session.add_all(accounts.values())
+    session.commit()
+    for account in accounts.values():
+        session.refresh(account)
+    return [{field: getattr(account, field) for field in ACCOUNT_FIELDS} for account in accounts.values()]
+
+@router.post("/batch/run")
+def run_account_tasks(payload: AccountIds, session: Session = Depends(get_session)):
+    """계정들의 Task 를 모두 대기열에 등록 (POST /tasks/batch/run 과 같은 응답)"""
+    _load_accounts(session, payload.account_ids)
+    tasks = session.exec(select(Task).where(Task.account_id.in_(payload.account_ids)).order_by(Task.id)).all()
+    jobs = job_queue.enqueue_many(session, tasks)
+    queued = {task_id: job.id for task_id, job in jobs.items() if job}
+    skipped = [task_id for task_id, job in jobs.items() if job is None]
+    return {"status": "queued", "jobs": queued, "queue_full": skipped}
+
+@router.post("/batch/verify")
+async def verify_accounts(payload: AccountIds):
+    """여러 계정 로그인 상태 확인 (동시 실행 수는 브라우저 풀 크기로 제한)"""
+    account_ids = list(dict.fromkeys(payload.account_ids))
+    accounts = await run_db(lambda session: _load_accounts(session, account_ids))
+
+    async def verify(account):
+        try:
+            return "valid" if await actions.verify_session(account) else "invalid"
+        except Exception as e:
+            print(f"Verify failed for account {account.id}: {e}")
+            return "error"
+
+    results = await asyncio.gather(*(verify(accounts[i]) for i in account_ids))
+    return {"status": "done", "results": dict(zip(account_ids, results))}
+
+class AccountBatchDelete(SQLModel):
+    account_ids: List[int]
+    delete_tasks: bool = False # Also delete the accounts' tasks (otherwise 409 if any exist)
+
+@router.post("/batch/delete")
+def delete_accounts(payload: AccountBatchDelete, session: Session = Depends(get_session)):
+    account_ids = list(dict.fromkeys(payload.account_ids))
+    found = set(session.exec(select(Account.id).where(Account.id.in_(account_ids))).all())
+    missing = sorted(set(account_ids) - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Accounts not found: {missing}")
+
+    task_ids = session.exec(select(Task.id).where(Task.account_id.in_(account_ids))).all()
+    if task_ids and not payload.delete_tasks:
+        raise HTTPException(status_code=409, detail=f"Accounts still have {len(task_ids)} task(s); pass delete_tasks=true")
+
+    if task_ids:
+        delete_task_rows(session, task_ids)
+    storage_state.delete_many(session, account_ids)
+    session.exec(delete(Account).where(Account.id.in_(account_ids)))
+    session.commit()
+    return {"status": "success", "deleted": len(account_ids), "deleted_tasks": len(task_ids)}
+
 @router.post("/{account_id}/verify")
-async def verify_account(account_id: int, session: Session = Depends(get_session)):
-    account = session.get(Account, account_id)
+async def verify_account(account_id: int):
+    # async 라우트: DB 조회는 스레드에서 (브라우저 확인 동안 이벤트 루프를 막지 않음)
+    account = await run_db(lambda session: session.get(Account, account_id))
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
@@ -26,7 +118,7 @@ async def verify_account(account_id: int, session: Session = Depends(get_session
     return {"status": "valid" if is_valid else "invalid", "account_id": account_id}
 
 @router.delete("/{account_id}")
-async def delete_account(account_id: int, session: Session = Depends(get_session)):
+def delete_account(account_id: int, session: Session = Depends(get_session)):
     account = session.get(Account, account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
@@ -40,6 +132,7 @@ async def delete_account(account_id: int, session: Session = Depends(get_session
     # But to be safe, we delete manually if we didn't config models heavily.
     # Let's just try delete.
     try:
+        storage_state.delete(session, account_id)
         session.delete(account)
         session.commit()
     except Exception as e:
@@ -48,88 +141,38 @@ async def delete_account(account_id: int, session: Session = Depends(get_session
     return {"status": "success", "message": "Account deleted"}
 
 # Manual Login Logic
-@router.post("/login")
-async def start_manual_login(session: Session = Depends(get_session)):
+class LoginRequest(SQLModel):
+    naver_id: Optional[str] = None # Account name (otherwise the ID typed into the login form)
+    account_id: Optional[int] = None # Re-login an existing account
+
+@router.post("/login", status_code=202)
+async def start_manual_login(payload: Optional[LoginRequest] = None):
     """
-    Launches a browser for the user to log in manually.
-    Waits for the user to visit a specific success page or close the window?
-    Actually for Naver, we just wait for them to log in then capture cookies.
+    Opens a Naver login page in the shared browser and returns a login job right away.
+    The session is captured when Naver issues the NID_AUT cookie; follow the job with
+    GET /accounts/login/{job_id} or the "login" events on /events/stream.
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-        
-        await page.goto("https://nid.naver.com/nidlogin.login")
-        
-        # Poll for login success (check if url changes to main naver or if specific cookie exists)
-        # We'll give them 2 minutes to login.
-        print("Waiting for login...")
-        
-        logged_in = False
-        naver_id = ""
-        nickname = ""
-        
-        for _ in range(120): # 2 minutes
-            await asyncio.sleep(1)
-            # Check if we are redirected to www.naver.com or similar
-            if "naver.com" in page.url and "nidlogin" not in page.url:
-                # Try to get user info to verify
-                cookies = await context.cookies()
-                # Check for NID_AUT and NID_SES
-                nid_aut = next((c for c in cookies if c['name'] == 'NID_AUT'), None)
-                if nid_aut:
-                    logged_in = True
-                    # Let's try to scrape the ID/Nickname if possible, or just save generic
-                    # Navigate to cafe main to get nickname? Or user info page.
-                    break
-        
-        if logged_in:
-            # Navigate to user info page to scrape ID/Nickname
-            try:
-                # This is a common Naver user info/security page that shows ID
-                await page.goto("https://nid.naver.com/user2/help/myInfo.nhn?menu=home", wait_until="domcontentloaded")
-                
-                # Naver's DOM structure changes, but usually ID is in some profile area.
-                # Let's try a safe approach: just use the NID_AUT cookie as a unique handle if scraping fails,
-                # but try to find the ID element.
-                # Common selector for ID in Naver GN (Global Navigation) or MyInfo
-                # Let's try getting it from the GN area on main page if MyInfo is complex.
-                await page.goto("https://www.naver.com", wait_until="domcontentloaded")
-                await asyncio.sleep(2) # Wait for JS to render login info
-                
-                # Selector for "Naver ID" on the main page login area (often .my_info .nickname or similar)
-                # Attempt to get text content of the logged-in user button
-                # This is brittle. A better way: parsed token? No.
-                # Let's just use "Naver User" + timestamp if we can't find it easily, 
-                # allowing user to rename it later in the UI is a good fallback.
-                
-                final_id = "AutoUser_" + str(int(asyncio.get_event_loop().time()))
-                final_nick = "Naver User"
-                
-                # Try simple selector
-                # element = await page.query_selector("class_name_here") 
-                
-            except Exception as e:
-                print(f"Scraping failed: {e}")
-                final_id = "UnknownID"
-                final_nick = "User"
-
-            cookies = await context.cookies()
-            new_account = Account(
-                naver_id=final_id,
-                nickname=final_nick, 
-                cookies_json=json.dumps(cookies)
-            )
-            session.add(new_account)
-            session.commit()
-            session.refresh(new_account)
-            
-            await browser.close()
-            return {"status": "success", "account_id": new_account.id, "message": "Login successful"}
-        
-        await browser.close()
-        raise HTTPException(status_code=408, detail="Login timeout or failed")
+    payload = payload or LoginRequest()
+    account = None
+    if payload.account_id is not None:
+        account = await run_db(lambda session: session.get(Account, payload.account_id))
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+    job, created = login_jobs.start(naver_id=payload.naver_id, account=account)
+    return {**job.to_dict(), "created": created}
+
+@router.get("/login/{job_id}")
+def get_login_job(job_id: str):
+    job = login_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Login job not found")
+    return job.to_dict()
+
+@router.delete("/login/{job_id}")
+def cancel_login_job(job_id: str):
+    if not login_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Login job is not running")
+    return {"status": "cancelling", "job_id": job_id}
 
 @router.post("/open-dashboard")
 async def open_dashboard_ui(background_tasks: BackgroundTasks):
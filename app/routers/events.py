@@ -0,0 +1,35 @@
+from typing import List, Optional
+from fastapi import APIRouter, Request, Query, Header
+from fastapi.responses import StreamingResponse
+from app.events import bus, format_sse
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    task_id: Optional[List[int]] = Query(None),
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-Sent Events: task status changes and new log lines, pushed as they happen.
+    - task_id: subscribe to specific tasks only (repeatable). Omit for all tasks.
+    - last_event_id / Last-Event-ID header: resume after that event (EventSource sends the header on reconnect)
+    """
+    after_id = last_event_id
+    if after_id is None and last_event_id_header and last_event_id_header.isdigit():
+        after_id = int(last_event_id_header)
+
+    async def event_source():
+        yield "retry: 3000\n\n"
+        async for event in bus.subscribe(task_id, after_id):
+            if await request.is_disconnected():
+                break
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
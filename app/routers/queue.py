@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+from app.database import get_session
+from app.models import Job
+from app.job_queue import job_queue
+from app.workers import supervisor
+
+router = APIRouter(prefix="/queue", tags=["queue"])
+
+@router.get("/")
+def queue_status(session: Session = Depends(get_session)):
+    status = job_queue.status(session)
+    if supervisor.active:
+        status["worker_processes"] = supervisor.status()
+    return status
+
+@router.get("/jobs")
+def list_jobs(status: Optional[str] = None, limit: int = 50, session: Session = Depends(get_session)):
+    query = select(Job).order_by(Job.id.desc()).limit(min(limit, 500))
+    if status:
+        query = query.where(Job.status == status.upper())
+    return session.exec(query).all()
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: int, session: Session = Depends(get_session)):
+    if not job_queue.cancel(session, job_id):
+        raise HTTPException(status_code=409, detail="Job not found or not queued")
+    return {"status": "cancelled"}
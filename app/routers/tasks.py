@@ -1,14 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlmodel import Session, select
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import Session, SQLModel, select, delete
 from app.database import get_session
-from app.models import Task, Account, Log
-from app.engine import actions
+from app.models import Task, Account, Log, Job, TaskRun, RunSpan, PostedArticle
+from app.job_queue import job_queue, QueueFull
+from app.schedule import next_run_time, validate_schedule
+from app.resource_block import resolve_profile
+from app.cafe_menu import resolve_board
+from app.listing import parse_fields, fetch_page, list_response
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# 목록 기본 컬럼 (content_html 같은 큰 컬럼은 ?fields= 로 요청하거나 GET /tasks/{id})
+TASK_SUMMARY_FIELDS = [
+    "id", "name", "title", "account_id", "cafe_url", "board_name",
+    "schedule_interval_minutes", "schedule_cron", "next_run_at",
+    "resource_profile", "content_format", "club_id", "menu_id",
+]
+TASK_FIELDS = TASK_SUMMARY_FIELDS + ["content_html"]
+
 @router.get("/")
-def list_tasks(session: Session = Depends(get_session)):
-    return session.exec(select(Task)).all()
+def list_tasks(
+    request: Request,
+    account_id: Optional[int] = None,
+    after: Optional[int] = None,
+    limit: int = 200,
+    fields: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    columns = parse_fields(fields, TASK_FIELDS, TASK_SUMMARY_FIELDS)
+    where = [Task.account_id == account_id] if account_id is not None else []
+    items, limit = fetch_page(session, Task, columns, after, limit, where)
+    return list_response(request, items, limit)
+
+@router.get("/{task_id}")
+def get_task(task_id: int, session: Session = Depends(get_session)):
+    task = session.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+def _validate_task(task, reschedule=True):
+    """Task 설정값 검증 (잘못된 경우 ValueError) + 다음 실행 시각 계산 (reschedule=False 면 그대로 둠)"""
+    validate_schedule(task)
+    if task.resource_profile:
+        resolve_profile(task.resource_profile)
+    if task.content_format not in (None, "text", "html"):
+        raise ValueError("content_format must be 'text' or 'html'")
+    if task.max_retries is not None and task.max_retries < 0:
+        raise ValueError("max_retries must be 0 or more")
+    if reschedule:
+        task.next_run_at = next_run_time(task)
+
+def delete_task_rows(session, task_ids):
+    """Task 와 관련 행 삭제 (테이블마다 DELETE ... WHERE task_id IN (...) 한 번씩, 커밋은 호출한 쪽에서)"""
+    # Delete associated rows first to avoid FK constraint/cascade issues
+    for model in (Log, RunSpan, TaskRun, Job, PostedArticle):
+        session.exec(delete(model).where(model.task_id.in_(task_ids)))
+    session.exec(delete(Task).where(Task.id.in_(task_ids)))
 
 @router.post("/")
 def create_task(task: Task, session: Session = Depends(get_session)):
@@ -16,6 +65,13 @@ def create_task(task: Task, session: Session = Depends(get_session)):
     account = session.get(Account, task.account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
+
+    try:
+        _validate_task(task)
+        # 게시판 이름 -> menuid (카페 게시판 목록 캐시), 없는 게시판이면 422
+        resolve_board(session, task)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
     session.add(task)
     session.commit()
@@ -28,26 +84,165 @@ def delete_task(task_id: int, session: Session = Depends(get_session)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
         
-    # Manually delete associated logs first to avoid FK constraint/cascade issues
-    logs = session.exec(select(Log).where(Log.task_id == task_id)).all()
-    for log in logs:
-        session.delete(log)
-        
-    session.delete(task)
+    delete_task_rows(session, [task_id])
     session.commit()
     return {"status": "success"}
 
+# ---- Batch endpoints (one validation query, one transaction) ----
+
+class TaskIds(SQLModel):
+    task_ids: List[int]
+
+class TaskPatch(SQLModel):
+    id: int
+    name: Optional[str] = None
+    title: Optional[str] = None
+    board_name: Optional[str] = None
+    content_html: Optional[str] = None
+    content_format: Optional[str] = None
+    resource_profile: Optional[str] = None
+    schedule_interval_minutes: Optional[int] = None
+    schedule_cron: Optional[str] = None
+    max_retries: Optional[int] = None
+
+# Task 의 NOT NULL 컬럼 (PATCH 에서 생략은 가능하지만 null 로 지울 수는 없음)
+REQUIRED_PATCH_FIELDS = ("name", "board_name", "content_html")
+SCHEDULE_FIELDS = ("schedule_interval_minutes", "schedule_cron")
+
+def _load_tasks(session, task_ids):
+    """task_ids 를 한 번에 조회, 없는 id 가 있으면 404"""
+    tasks = {t.id: t for t in session.exec(select(Task).where(Task.id.in_(task_ids))).all()}
+    missing = sorted(set(task_ids) - set(tasks))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Tasks not found: {missing}")
+    return tasks
+
+@router.post("/batch")
+def create_tasks(payload: List[Task], session: Session = Depends(get_session)):
+    account_ids = {t.account_id for t in payload}
+    found = set(session.exec(select(Account.id).where(Account.id.in_(account_ids))).all())
+    missing = sorted(account_ids - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Accounts not found: {missing}")
+
+    errors = {}
+    for index, task in enumerate(payload):
+        try:
+            _validate_task(task)
+            resolve_board(session, task)
+        except ValueError as e:
+            errors[index] = str(e)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    session.add_all(payload)
+    session.commit()
+    for task in payload:
+        session.refresh(task)
+    return payload
+
+@router.patch("/batch")
+def update_tasks(patches: List[TaskPatch], session: Session = Depends(get_session)):
+    tasks = _load_tasks(session, [p.id for p in patches])
+    errors, drafts = {}, {}
+    for patch in patches:
+        changes = patch.model_dump(exclude_unset=True, exclude={"id"})
+        nulls = [field for field in REQUIRED_PATCH_FIELDS if field in changes and changes[field] is None]
+        if nulls:
+            errors[patch.id] = f"{', '.join(nulls)} cannot be null"
+            continue
+        # 검증은 세션 밖 사본으로 (하나라도 실패하면 어떤 Task 도 바뀌지 않음)
+        draft = Task(**(drafts.get(patch.id) or tasks[patch.id]).model_dump())
+        for field, value in changes.items():
+            setattr(draft, field, value)
+        try:
+            # 스케줄을 바꿀 때만 다음 실행 시각을 다시 계산 (제목만 고쳤는데 실행이 한 주기 밀리지 않도록)
+            _validate_task(draft, reschedule=any(field in changes for field in SCHEDULE_FIELDS))
+            if "board_name" in changes:
+                draft.menu_id = None
+                resolve_board(session, draft)
+        except ValueError as e:
+            errors[patch.id] = str(e)
+            continue
+        drafts[patch.id] = draft
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    for task_id, draft in drafts.items():
+        task = tasks[task_id]
+        for field, value in draft.model_dump(exclude={"id"}).items():
+            setattr(task, field, value)
+    session.add_all(tasks.values())
+    session.commit()
+    for task in tasks.values():
+        session.refresh(task)
+    return list(tasks.values())
+
+@router.post("/batch/run")
+def run_tasks(payload: TaskIds, session: Session = Depends(get_session)):
+    tasks = _load_tasks(session, payload.task_ids)
+    jobs = job_queue.enqueue_many(session, [tasks[i] for i in dict.fromkeys(payload.task_ids)])
+    queued = {task_id: job.id for task_id, job in jobs.items() if job}
+    skipped = [task_id for task_id, job in jobs.items() if job is None]
+    return {"status": "queued", "jobs": queued, "queue_full": skipped}
+
+@router.post("/batch/delete")
+def delete_tasks(payload: TaskIds, session: Session = Depends(get_session)):
+    _load_tasks(session, payload.task_ids)
+    delete_task_rows(session, payload.task_ids)
+    session.commit()
+    return {"status": "success", "deleted": len(set(payload.task_ids))}
+
+class ScheduleUpdate(SQLModel):
+    schedule_interval_minutes: Optional[int] = None
+    schedule_cron: Optional[str] = None
+
+@router.put("/{task_id}/schedule")
+def update_schedule(task_id: int, schedule: ScheduleUpdate, session: Session = Depends(get_session)):
+    task = session.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    task.schedule_interval_minutes = schedule.schedule_interval_minutes
+    task.schedule_cron = schedule.schedule_cron or None
+    try:
+        _validate_task(task)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    session.add(task)
+    session.commit()
+    session.refresh(task)
+    return task
+
 @router.post("/{task_id}/run")
-async def run_task(task_id: int, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
+def run_task(task_id: int, session: Session = Depends(get_session)):
     task = session.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Run in background to not block response
-    background_tasks.add_task(actions.run_task, task_id)
-    return {"status": "started", "message": f"Task {task.name} started"}
+    # Durable queue: survives restarts and respects worker/cafe limits
+    try:
+        job = job_queue.enqueue(session, task)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"status": "queued", "job_id": job.id, "message": f"Task {task.name} queued"}
 
 @router.get("/{task_id}/logs")
 def get_task_logs(task_id: int, session: Session = Depends(get_session)):
     # return last 10 logs
     return session.exec(select(Log).where(Log.task_id == task_id).order_by(Log.timestamp.desc()).limit(10)).all()
+
+@router.get("/{task_id}/runs")
+def get_task_runs(task_id: int, limit: int = 20, session: Session = Depends(get_session)):
+    # Run summaries (start/end/status/step count), newest first
+    return session.exec(
+        select(TaskRun).where(TaskRun.task_id == task_id).order_by(TaskRun.id.desc()).limit(min(limit, 200))
+    ).all()
+
+@router.get("/{task_id}/runs/{run_id}/spans")
+def get_run_spans(task_id: int, run_id: int, session: Session = Depends(get_session)):
+    # Per-phase timings of one run, in execution order
+    return session.exec(
+        select(RunSpan).where(RunSpan.task_id == task_id, RunSpan.run_id == run_id).order_by(RunSpan.id)
+    ).all()
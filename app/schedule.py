@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+
+class CronError(ValueError):
+    pass
+
+
+# (최소값, 최대값) - 분, 시, 일, 월, 요일(0=일요일, 7도 일요일로 허용)
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid step: '{step_text}'")
+            step = int(step_text)
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise CronError(f"Invalid range: '{part}'")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = int(part)
+            end = high if step > 1 else start
+        else:
+            raise CronError(f"Invalid value: '{part}'")
+
+        if start < low or end > high or start > end:
+            raise CronError(f"Value out of range {low}-{high}: '{part}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expr):
+    """
+    5필드 cron 표현식 파싱 ("분 시 일 월 요일")
+    지원: *, 숫자, a-b, a,b, */n, a-b/n
+    """
+    fields = (expr or "").split()
+    if len(fields) != 5:
+        raise CronError("Cron expression must have 5 fields: 'minute hour day month weekday'")
+    parsed = [_parse_field(f, low, high) for f, (low, high) in zip(fields, _FIELD_RANGES)]
+    if 7 in parsed[4]:
+        parsed[4].discard(7)
+        parsed[4].add(0)
+    # 표준 cron 규칙: 일/요일이 모두 제한되어 있으면 둘 중 하나만 맞아도 실행
+    dom_any = fields[2] == "*"
+    dow_any = fields[4] == "*"
+    return parsed, dom_any, dow_any
+
+
+def next_cron_time(expr, after):
+    """after 이후(초과) 첫 실행 시각"""
+    (minutes, hours, days, months, weekdays), dom_any, dow_any = parse_cron(expr)
+
+    def day_matches(t):
+        dom_ok = t.day in days
+        dow_ok = (t.isoweekday() % 7) in weekdays
+        if dom_any or dow_any:
+            return dom_ok and dow_ok
+        return dom_ok or dow_ok
+
+    t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = after + timedelta(days=366 * 5)
+    while t <= limit:
+        if t.month not in months:
+            # 다음 달 1일 0시로 건너뜀
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        if not day_matches(t):
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if t.hour not in hours:
+            t = t.replace(minute=0) + timedelta(hours=1)
+            continue
+        if t.minute not in minutes:
+            t += timedelta(minutes=1)
+            continue
+        return t
+    raise CronError(f"Cron expression never fires: '{expr}'")
+
+
+def next_run_time(task, after=None):
+    """Task의 스케줄 설정으로 다음 실행 시각 계산 (스케줄이 없으면 None)"""
+    after = after or datetime.now()
+    if task.schedule_cron:
+        return next_cron_time(task.schedule_cron, after)
+    if task.schedule_interval_minutes:
+        return after + timedelta(minutes=task.schedule_interval_minutes)
+    return None
+
+
+def validate_schedule(task):
+    """스케줄 값 검증 (잘못된 경우 CronError/ValueError)"""
+    if task.schedule_interval_minutes is not None and task.schedule_interval_minutes <= 0:
+        raise ValueError("schedule_interval_minutes must be positive")
+    if task.schedule_cron:
+        parse_cron(task.schedule_cron)
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime
+from sqlmodel import Session, select
+from app.models import SelectorMemo
+from app.database import engine as db_engine
+
+# (cafe_key, slot) -> selector key. DB 내용을 프로세스 메모리에 캐시
+_cache = None
+
+
+def _load():
+    global _cache
+    if _cache is None:
+        with Session(db_engine) as session:
+            _cache = {(m.cafe_key, m.slot): m.selector for m in session.exec(select(SelectorMemo)).all()}
+    return _cache
+
+
+def editor_variant(url):
+    """에디터 종류 구분 (URL만 보고 판단하므로 브라우저 왕복 없음)"""
+    return "legacy" if ".nhn" in (url or "").lower() else "modern"
+
+
+def recall(cafe_key, slot):
+    return _load().get((cafe_key, slot))
+
+
+def prefer(candidates, remembered):
+    """[(key, locator)] 에서 기억된 후보를 맨 앞으로 (나머지 순서는 유지)"""
+    if not remembered:
+        return list(candidates)
+    first = [c for c in candidates if c[0] == remembered]
+    rest = [c for c in candidates if c[0] != remembered]
+    return first + rest
+
+
+def remember(cafe_key, slot, selector):
+    """성공한 후보 기록 (바뀐 경우에만 DB에 씀)"""
+    cache = _load()
+    if cache.get((cafe_key, slot)) == selector:
+        return
+    cache[(cafe_key, slot)] = selector
+    try:
+        # 실행 중에는 이벤트 루프를 막지 않도록 스레드에서 저장
+        asyncio.get_running_loop().run_in_executor(None, _write, cafe_key, slot, selector)
+    except RuntimeError:
+        _write(cafe_key, slot, selector)
+
+
+def preload():
+    """DB 에서 캐시를 미리 읽어둠 (run_task 에서 스레드로 호출)"""
+    _load()
+
+
+def _write(cafe_key, slot, selector):
+    with Session(db_engine) as session:
+        memo = session.exec(
+            select(SelectorMemo).where(SelectorMemo.cafe_key == cafe_key, SelectorMemo.slot == slot)
+        ).first()
+        if memo is None:
+            memo = SelectorMemo(cafe_key=cafe_key, slot=slot, selector=selector)
+        memo.selector = selector
+        memo.updated_at = datetime.now()
+        session.add(memo)
+        session.commit()
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from app.config import settings
+
+# 네이버 로그인 세션 쿠키
+AUTH_COOKIES = ("NID_AUT", "NID_SES")
+
+
+def auth_cookie_expiry(cookies):
+    """
+    NID_AUT/NID_SES 중 가장 빠른 만료 시각
+    - 둘 중 하나라도 없으면 False (로그인 안 된 상태)
+    - 둘 다 세션 쿠키(expires=-1)면 None (만료 시각 정보 없음)
+    """
+    found = {c["name"]: c for c in cookies if c.get("name") in AUTH_COOKIES}
+    if len(found) < len(AUTH_COOKIES):
+        return False
+    expiries = [c["expires"] for c in found.values() if c.get("expires", -1) and c.get("expires", -1) > 0]
+    if not expiries:
+        return None
+    return datetime.fromtimestamp(min(expiries))
+
+
+def session_is_fresh(account, cookies, now=None):
+    """
+    naver.com 로그인 확인을 건너뛰어도 되는지 판단 -> (bool, 이유)
+    - 인증 쿠키가 모두 있고
+    - 만료까지 SESSION_EXPIRY_MARGIN_MIN 분 이상 남았고
+    - 마지막으로 정상 확인한 지 SESSION_CHECK_TTL_MIN 분이 안 지났을 때만 True
+    """
+    now = now or datetime.now()
+    expiry = auth_cookie_expiry(cookies)
+    if expiry is False:
+        return False, "auth cookies missing"
+    if expiry is not None and expiry - now < timedelta(minutes=settings.SESSION_EXPIRY_MARGIN_MIN):
+        return False, "auth cookies near expiry"
+    checked = account.session_checked_at
+    if checked is None:
+        return False, "never verified"
+    if now - checked > timedelta(minutes=settings.SESSION_CHECK_TTL_MIN):
+        return False, "last check too old"
+    return True, "verified recently"
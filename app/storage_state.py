@@ -0,0 +1,87 @@
+import hashlib
+import json
+from datetime import datetime
+from sqlmodel import Session, delete as delete_stmt
+from app.models import Account, AccountStorage
+from app.database import engine as db_engine
+
+
+def state_hash(state):
+    """쿠키/스토리지 순서와 무관한 해시"""
+    cookies = sorted(state.get("cookies", []), key=lambda c: (c.get("domain", ""), c.get("path", ""), c.get("name", "")))
+    origins = sorted(state.get("origins", []), key=lambda o: o.get("origin", ""))
+    canonical = json.dumps({"cookies": cookies, "origins": origins}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load(account_id):
+    """
+    계정의 storage state (새 컨텍스트 생성 시 storage_state= 로 바로 사용) / 없으면 None
+    예전 Account.cookies_json 만 있는 계정은 여기로 옮기고 cookies_json 은 비움
+    """
+    with Session(db_engine) as session:
+        stored = session.get(AccountStorage, account_id)
+        if stored:
+            return json.loads(stored.state_json)
+
+        account = session.get(Account, account_id)
+        if not account or not account.cookies_json or len(account.cookies_json) <= 10:
+            return None
+        try:
+            state = {"cookies": json.loads(account.cookies_json), "origins": []}
+        except ValueError:
+            return None
+        _write(session, account_id, state)
+        account.cookies_json = "[]"
+        session.add(account)
+        session.commit()
+        return state
+
+
+def save(account_id, state):
+    with Session(db_engine) as session:
+        _write(session, account_id, state)
+        session.commit()
+
+
+def stored_hash(account_id):
+    """DB 에 저장된 state 의 해시 / 없으면 None"""
+    with Session(db_engine) as session:
+        stored = session.get(AccountStorage, account_id)
+        return stored.state_hash if stored else None
+
+
+def save_if_current(account_id, state, base):
+    """
+    base(컨텍스트가 로드/저장한 state 해시) 이후로 다른 곳(로그인 창, 다른 프로세스)에서
+    다시 쓰지 않았을 때만 저장 -> "unchanged" / "saved" / "stale"(저장 안 함)
+    """
+    digest = state_hash(state)
+    if digest == base:
+        return "unchanged"
+    with Session(db_engine) as session:
+        stored = session.get(AccountStorage, account_id)
+        if (stored.state_hash if stored else None) != base:
+            return "stale"
+        _write(session, account_id, state)
+        session.commit()
+    return "saved"
+
+
+def _write(session, account_id, state):
+    digest = state_hash(state)
+    stored = session.get(AccountStorage, account_id) or AccountStorage(account_id=account_id)
+    stored.state_json = json.dumps(state, ensure_ascii=False)
+    stored.state_hash = digest
+    stored.updated_at = datetime.now()
+    session.add(stored)
+
+
+def delete(session, account_id):
+    stored = session.get(AccountStorage, account_id)
+    if stored:
+        session.delete(stored)
+
+
+def delete_many(session, account_ids):
+    session.exec(delete_stmt(AccountStorage).where(AccountStorage.account_id.in_(account_ids)))
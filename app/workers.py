@@ -0,0 +1,213 @@
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from sqlmodel import Session, select, func, or_
+from app.models import Job, Log, TaskRun, RunSpan, Worker
+from app.database import engine as db_engine
+from app.config import settings
+from app.events import bus
+from app.metrics import metrics
+from app.job_queue import recover_jobs
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "worker.py")
+
+
+def worker_name(index):
+    return f"worker-{index}"
+
+
+class WorkerSupervisor:
+    """
+    워커 프로세스 관리 (WORKER_PROCESSES > 0 일 때 API 프로세스가 코디네이터 역할)
+    - worker.py 프로세스 N개 실행, 종료되면 다시 실행
+    - 프로세스가 죽었거나 하트비트가 끊긴 워커의 RUNNING 작업은 다시 대기열로
+      (재시도 횟수를 다 쓴 작업은 실패 처리 -> 워커를 죽이는 작업이 계속 다시 실행되지 않도록)
+    - 워커가 DB 에 남긴 로그/실행 결과/단계 시간을 이벤트 스트림(bus)과 /metrics 로 전달
+    """
+
+    def __init__(self, count, heartbeat_timeout=60.0, relay_interval=1.0):
+        self.count = count
+        self.heartbeat_timeout = heartbeat_timeout
+        self.relay_interval = relay_interval
+        self._procs = {}  # index -> Popen
+        self._tasks = []
+        self._running = False
+        # relay 커서
+        self._last_log_id = 0
+        self._last_span_id = 0
+        self._last_run_id = 0
+        self._open_runs = set()  # 아직 끝나지 않은 TaskRun id
+        self._job_status = {}  # job_id -> 마지막으로 알린 status
+
+    @property
+    def active(self):
+        return self._running
+
+    async def start(self):
+        if self._running:
+            return
+        self._init_cursors()
+        self._running = True
+        for index in range(self.count):
+            self._spawn(index)
+        self._tasks = [asyncio.create_task(self._monitor()), asyncio.create_task(self._relay())]
+        print(f"👷 Started {self.count} worker process(es)")
+
+    async def stop(self):
+        self._running = False
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for proc in self._procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in self._procs.values():
+            try:
+                await asyncio.to_thread(proc.wait, 15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self._procs = {}
+
+    def status(self):
+        with Session(db_engine) as session:
+            beats = {w.name: w for w in session.exec(select(Worker)).all()}
+        workers = []
+        for index in range(self.count):
+            name = worker_name(index)
+            proc = self._procs.get(index)
+            beat = beats.get(name)
+            workers.append({
+                "name": name,
+                "pid": proc.pid if proc else None,
+                "alive": bool(proc and proc.poll() is None),
+                "started_at": beat.started_at if beat else None,
+                "heartbeat_at": beat.heartbeat_at if beat else None,
+            })
+        return workers
+
+    # ---- 프로세스 관리 ----
+
+    def _spawn(self, index):
+        self._procs[index] = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, "--index", str(index), "--count", str(self.count)],
+            cwd=os.path.dirname(WORKER_SCRIPT),
+        )
+        print(f"👷 {worker_name(index)} started (pid {self._procs[index].pid})")
+
+    async def _monitor(self):
+        while self._running:
+            await asyncio.sleep(settings.WORKER_HEARTBEAT_SEC)
+            try:
+                await asyncio.to_thread(self._check_workers)
+            except Exception as e:
+                print(f"Worker monitor error: {e}")
+
+    def _check_workers(self):
+        stale_before = datetime.now() - timedelta(seconds=self.heartbeat_timeout)
+        with Session(db_engine) as session:
+            beats = {w.name: w for w in session.exec(select(Worker)).all()}
+        for index, proc in list(self._procs.items()):
+            name = worker_name(index)
+            if proc.poll() is None:
+                beat = beats.get(name)
+                if beat is None or beat.pid != proc.pid:
+                    # 아직 첫 하트비트 전 (시작 중)
+                    continue
+                if beat.heartbeat_at >= stale_before:
+                    continue
+                print(f"💀 {name} (pid {proc.pid}) missed heartbeats, killing...")
+                proc.kill()
+                proc.wait()
+            else:
+                print(f"💀 {name} (pid {proc.pid}) exited with code {proc.returncode}")
+            self._requeue(name)
+            if self._running:
+                self._spawn(index)
+
+    def _requeue(self, name):
+        with Session(db_engine) as session:
+            jobs = session.exec(select(Job).where(Job.status == "RUNNING", Job.worker_id == name)).all()
+            if not jobs:
+                return
+            requeued, failed = recover_jobs(session, jobs, "Worker process died")
+        print(f"♻️ Re-queued {requeued} job(s) from {name}" + (f", failed {failed}" if failed else ""))
+
+    # ---- 이벤트/지표 전달 ----
+
+    def _init_cursors(self):
+        with Session(db_engine) as session:
+            self._last_log_id = session.exec(select(func.max(Log.id))).one() or 0
+            self._last_span_id = session.exec(select(func.max(RunSpan.id))).one() or 0
+            self._last_run_id = session.exec(select(func.max(TaskRun.id))).one() or 0
+
+    async def _relay(self):
+        while self._running:
+            try:
+                events = await asyncio.to_thread(self._collect)
+                for kind, task_id, data in events:
+                    bus.publish(kind, task_id, data)
+            except Exception as e:
+                print(f"Worker relay error: {e}")
+            await asyncio.sleep(self.relay_interval)
+
+    def _collect(self):
+        """마지막 확인 이후 워커가 DB 에 쓴 내용 -> [(kind, task_id, data)] (지표는 여기서 바로 반영)"""
+        events = []
+        with Session(db_engine) as session:
+            # 새로 시작한 실행
+            runs = session.exec(select(TaskRun).where(TaskRun.id > self._last_run_id).order_by(TaskRun.id)).all()
+            for run in runs:
+                self._last_run_id = run.id
+                self._open_runs.add(run.id)
+                events.append(("run", run.task_id, {"run_id": run.id, "status": "RUNNING"}))
+
+            logs = session.exec(select(Log).where(Log.id > self._last_log_id).order_by(Log.id).limit(1000)).all()
+            for log in logs:
+                self._last_log_id = log.id
+                events.append(("log", log.task_id, {
+                    "status": log.status,
+                    "message": log.message,
+                    "timestamp": log.timestamp.isoformat(timespec="seconds"),
+                }))
+
+            spans = session.exec(select(RunSpan).where(RunSpan.id > self._last_span_id).order_by(RunSpan.id)).all()
+            failed_phase = {}
+            for span in spans:
+                self._last_span_id = span.id
+                metrics.observe_phase(span.phase, span.cafe_key, span.duration_ms / 1000)
+                if not span.ok:
+                    failed_phase[span.run_id] = span.phase
+
+            # 끝난 실행
+            if self._open_runs:
+                finished = session.exec(
+                    select(TaskRun).where(TaskRun.id.in_(self._open_runs), TaskRun.status != "RUNNING")
+                ).all()
+                for run in finished:
+                    self._open_runs.discard(run.id)
+                    metrics.record_run(run.status, failed_phase.get(run.id) if run.status != "SUCCESS" else None)
+                    events.append(("run", run.task_id, {"run_id": run.id, "status": run.status, "steps": run.step_count}))
+
+            # 작업 상태 변화
+            jobs = session.exec(
+                select(Job).where(or_(Job.status.in_(("QUEUED", "RUNNING")), Job.id.in_(list(self._job_status))))
+            ).all()
+            for job in jobs:
+                # QUEUED/CANCELLED 는 이 프로세스(enqueue/cancel)가 이미 알림
+                if self._job_status.get(job.id) != job.status and job.status not in ("QUEUED", "CANCELLED"):
+                    events.append(("job", job.task_id, {"job_id": job.id, "status": job.status, "error": job.error}))
+                if job.status in ("QUEUED", "RUNNING"):
+                    self._job_status[job.id] = job.status
+                else:
+                    self._job_status.pop(job.id, None)
+        return events
+
+
+supervisor = WorkerSupervisor(
+    settings.WORKER_PROCESSES,
+    heartbeat_timeout=settings.WORKER_HEARTBEAT_TIMEOUT_SEC,
+    relay_interval=settings.WORKER_RELAY_SEC,
+)
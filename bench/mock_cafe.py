@@ -0,0 +1,137 @@
+"""
+로컬 mock 네이버 카페/스마트에디터 서버 (벤치마크용)
+엔진이 의존하는 DOM 구조만 흉내냄:
+- www.naver.com: 로그인 상태 (로그인 버튼 없음)
+- 게시판: 신형(#cafe-info-data .btn_cafe_writing) / 구형(#cafe_main iframe 안의 글쓰기)
+- 글쓰기: 제목 textarea, .se-main-container 본문, button.btn_register -> POST .../articles -> {"result": {"articleId": N}}
+- 게시글: 삭제 버튼 -> confirm -> DELETE .../articles/N
+
+요청한 원래 호스트는 X-Mock-Host 헤더로 전달받음 (bench/run_bench.py 의 라우팅)
+"""
+import asyncio
+import itertools
+import random
+import re
+import zlib
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+
+NAVER_MAIN = """<html><body>
+<div id="account"><a class="link_logout" href="#">로그아웃</a></div>
+</body></html>"""
+
+LOGIN_PAGE = """<html><body><form id="frmNIDLogin"><input id="id"><input id="pw" type="password"></form></body></html>"""
+
+MODERN_BOARD = """<html><head><script>var g_sClubId = "{club}";</script></head><body>
+<div id="cafe-info-data"><a class="btn_cafe_writing" href="/ca-fe/cafes/{club}/articles/write?boardType=L&menuId={menu}">카페 글쓰기</a></div>
+<ul class="cafe-menu-list"><li><a href="/ArticleList.nhn?search.clubid={club}&search.menuid={menu}">{board}</a></li></ul>
+<div class="article-board"></div>
+</body></html>"""
+
+LEGACY_BOARD = """<html><head><script>var g_sClubId = "{club}";</script></head><body>
+<ul class="cafe-menu-list"><li><a href="/ArticleList.nhn?search.clubid={club}&search.menuid={menu}">{board}</a></li></ul>
+<iframe id="cafe_main" name="cafe_main" src="/cafe-main?club={club}&menu={menu}" width="860" height="600"></iframe>
+</body></html>"""
+
+LEGACY_FRAME = """<html><body>
+<a href="/ca-fe/cafes/{club}/articles/write?boardType=L&menuId={menu}" target="_top">글쓰기</a>
+</body></html>"""
+
+EDITOR = """<html><body>
+<textarea class="textarea_input" placeholder="제목을 입력해 주세요"></textarea>
+<div class="se-main-container"><div class="se-content" contenteditable="true"><p class="se-text-paragraph"></p></div></div>
+<button class="btn_register" onclick="submitArticle()">등록</button>
+<script>
+async function submitArticle() {
+    const base = location.pathname.replace(/\\/write$/, '');
+    const res = await fetch(base, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            subject: document.querySelector('textarea').value,
+            content: document.querySelector('.se-main-container').innerText,
+        }),
+    });
+    if (!res.ok) return;
+    const data = await res.json();
+    location.href = base + '/' + data.result.articleId;
+}
+</script>
+</body></html>"""
+
+ARTICLE = """<html><body>
+<div class="ArticleContentBox"><h3 class="title_text">article {article}</h3></div>
+<button class="BaseButton" onclick="removeArticle()">삭제</button>
+<script>
+async function removeArticle() {
+    if (!confirm('게시글을 삭제하시겠습니까?')) return;
+    await fetch(location.pathname, {method: 'DELETE'});
+    location.href = '/ca-fe/cafes/{club}/menus/0';
+}
+</script>
+</body></html>"""
+
+
+def create_app(latency_ms=0, fail_rate=0.0, layout="modern", board="자유게시판", seed=None):
+    """
+    latency_ms: 모든 응답에 더하는 지연
+    fail_rate: 글 등록(POST) 요청이 500 으로 실패할 확률
+    layout: 게시판 화면 "modern" / "legacy"
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+    article_ids = itertools.count(1000)
+    app.state.stats = {"requests": 0, "posted": 0, "deleted": 0, "failed": 0}
+
+    def board_page(club, menu):
+        template = LEGACY_BOARD if layout == "legacy" else MODERN_BOARD
+        return HTMLResponse(template.format(club=club, menu=menu, board=board))
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "DELETE"])
+    async def dispatch(request: Request, path: str):
+        stats = app.state.stats
+        stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        host = request.headers.get("x-mock-host", "cafe.naver.com")
+        if host in ("www.naver.com", "naver.com"):
+            return HTMLResponse(NAVER_MAIN)
+        if host == "nid.naver.com":
+            return HTMLResponse(LOGIN_PAGE)
+        if host != "cafe.naver.com":
+            return Response(status_code=404)
+
+        query = request.query_params
+        if path == "ArticleList.nhn":
+            return board_page(query.get("search.clubid", "1"), query.get("search.menuid", "1"))
+        if path == "cafe-main":
+            return HTMLResponse(LEGACY_FRAME.format(club=query.get("club", "1"), menu=query.get("menu", "1")))
+
+        match = re.fullmatch(r"(?:f-e|ca-fe)/cafes/(\d+)/menus/(\d+)", path)
+        if match:
+            return board_page(*match.groups())
+        match = re.fullmatch(r"ca-fe/cafes/(\d+)/articles/write", path)
+        if match:
+            return HTMLResponse(EDITOR)
+        match = re.fullmatch(r"ca-fe/cafes/(\d+)/articles", path)
+        if match and request.method == "POST":
+            if rng.random() < fail_rate:
+                stats["failed"] += 1
+                return JSONResponse({"error": "injected failure"}, status_code=500)
+            stats["posted"] += 1
+            return JSONResponse({"result": {"articleId": next(article_ids)}})
+        match = re.fullmatch(r"ca-fe/cafes/(\d+)/articles/(\d+)", path)
+        if match:
+            club, article = match.groups()
+            if request.method == "DELETE":
+                stats["deleted"] += 1
+                return JSONResponse({"result": "ok"})
+            return HTMLResponse(ARTICLE.replace("{club}", club).replace("{article}", article))
+
+        # 별칭 URL (cafe.naver.com/<name>) -> 게시판 (clubid 는 이름으로 고정 생성)
+        if re.fullmatch(r"[A-Za-z0-9_\-]+", path):
+            return board_page(str(zlib.crc32(path.encode()) % 10_000_000), "1")
+        return Response(status_code=404)
+
+    return app
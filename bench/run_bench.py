@@ -0,0 +1,232 @@
+"""
+오프라인 벤치마크: 로컬 mock 카페(bench/mock_cafe.py)에 대해 실제 엔진(run_task)을 돌려서
+처리량(runs/min), 성공률, 단계별(RunSpan) p50/p95 를 측정
+
+    python -m bench.run_bench --tasks 20 --concurrency 4 --latency-ms 50 --fail-rate 0.05
+
+- 네이버 주소(*.naver.com)로 가는 요청은 모두 mock 서버로 보내고, 그 외 호스트는 차단 (외부 네트워크 없음)
+- 별도 임시 DB 를 사용하므로 database.db 는 건드리지 않음
+- 계정마다 유효한 NID_AUT/NID_SES 쿠키를 심어두므로 로그인 단계는 건너뜀
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FLOWS = ("direct", "modern", "legacy")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline pull-up benchmark against a mock Naver Cafe")
+    parser.add_argument("--tasks", type=int, default=10, help="number of tasks (one run each per round)")
+    parser.add_argument("--rounds", type=int, default=1, help="runs per task (2+ also exercises deleting the previous post)")
+    parser.add_argument("--concurrency", type=int, default=2, help="concurrent runs (= accounts = pool size)")
+    parser.add_argument("--latency-ms", type=int, default=0, help="added latency per mock response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability that a submit returns 500")
+    parser.add_argument("--flow", choices=FLOWS, default="modern",
+                        help="direct: write page by clubid/menuid, modern/legacy: open the board first")
+    parser.add_argument("--profile", default="lite", help="resource blocking profile")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q * (len(values) - 1))))
+    return values[index]
+
+
+def start_mock(app, port):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f"mock server did not start on port {port}")
+        time.sleep(0.05)
+    return server
+
+
+def mock_router(base_url):
+    """BrowserContextPool.context_hooks 용: 네이버 요청 -> mock 서버, 나머지 -> 차단"""
+    async def handle(route, request):
+        parsed = urlparse(request.url)
+        host = parsed.hostname or ""
+        if not (host == "naver.com" or host.endswith(".naver.com")):
+            await route.abort()
+            return
+        target = base_url + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        try:
+            response = await route.fetch(url=target, headers={**request.headers, "x-mock-host": host})
+            await route.fulfill(response=response)
+        except Exception:
+            await route.abort()
+
+    async def install(context):
+        await context.route("**/*", handle)
+    return install
+
+
+def seed(flow, tasks, accounts, profile):
+    """계정(유효한 세션 쿠키 포함) + 작업 생성 -> task id 목록"""
+    from sqlmodel import Session
+    from app.database import engine as db_engine, create_db_and_tables
+    from app.models import Account, Task
+    from app.cafe_menu import store_menus
+    from app import storage_state
+
+    create_db_and_tables()
+    expires = time.time() + 86400
+    with Session(db_engine) as session:
+        account_rows = [
+            Account(naver_id=f"bench{i}", session_checked_at=datetime.now()) for i in range(accounts)
+        ]
+        session.add_all(account_rows)
+        session.commit()
+        for account in account_rows:
+            session.refresh(account)
+            storage_state.save(account.id, {
+                "cookies": [
+                    {"name": name, "value": f"bench-{account.id}", "domain": ".naver.com", "path": "/",
+                     "expires": expires, "httpOnly": True, "secure": True, "sameSite": "Lax"}
+                    for name in ("NID_AUT", "NID_SES")
+                ],
+                "origins": [],
+            })
+
+        task_rows = []
+        for i in range(tasks):
+            club = 1000 + i
+            if flow == "direct":
+                # 게시판 이름은 게시판 목록 캐시로 menuid 를 찾음 (목록 API 는 mock 으로 라우팅되지 않으므로 미리 저장)
+                cafe_url = f"https://cafe.naver.com/f-e/cafes/{club}/menus/1"
+                board_name = "자유게시판"
+                store_menus(club, [(1, board_name, "B")])
+            else:
+                # 별칭 URL -> 게시판에서 글쓰기 버튼 (ID 는 첫 실행에서 알아내서 저장)
+                cafe_url = f"https://cafe.naver.com/benchcafe{i}"
+                board_name = "default"
+            task_rows.append(Task(
+                name=f"bench-{i}", title=f"Bench post {i}", content_html=f"Benchmark content {i}\n" * 5,
+                account_id=account_rows[i % accounts].id, cafe_url=cafe_url, board_name=board_name,
+                resource_profile=profile,
+            ))
+        session.add_all(task_rows)
+        session.commit()
+        return [task.id for task in task_rows]
+
+
+def phase_stats():
+    from sqlmodel import Session, select
+    from app.database import engine as db_engine
+    from app.models import RunSpan
+
+    durations = {}
+    with Session(db_engine) as session:
+        for phase, duration_ms in session.exec(select(RunSpan.phase, RunSpan.duration_ms)).all():
+            durations.setdefault(phase, []).append(duration_ms)
+    return {
+        phase: {"count": len(values), "p50_ms": percentile(values, 0.5), "p95_ms": percentile(values, 0.95)}
+        for phase, values in sorted(durations.items())
+    }
+
+
+async def run(args, task_ids, base_url):
+    from app.engine import AutomationEngine
+
+    engine = AutomationEngine(headless=not args.headed, interactive=False)
+    engine.pool.context_hooks.append(mock_router(base_url))
+    slots = asyncio.Semaphore(args.concurrency)
+    results, latencies = {}, []
+
+    async def one(task_id):
+        async with slots:
+            started = time.perf_counter()
+            status = await engine.run_task(task_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+            results[status] = results.get(status, 0) + 1
+
+    started = time.perf_counter()
+    try:
+        for _ in range(args.rounds):
+            await asyncio.gather(*(one(task_id) for task_id in task_ids))
+    finally:
+        elapsed = time.perf_counter() - started
+        await engine.logs.close()
+        await engine.close()
+
+    total = sum(results.values())
+    return {
+        "runs": total,
+        "by_status": results,
+        "success_rate": round(results.get("SUCCESS", 0) / total, 3) if total else None,
+        "elapsed_sec": round(elapsed, 2),
+        "runs_per_min": round(total / elapsed * 60, 2) if elapsed else None,
+        "run_p50_ms": percentile(latencies, 0.5),
+        "run_p95_ms": percentile(latencies, 0.95),
+    }
+
+
+def print_report(report):
+    print()
+    print(f"Runs: {report['runs']}  {report['by_status']}  success rate: {report['success_rate']}")
+    print(f"Elapsed: {report['elapsed_sec']}s  ->  {report['runs_per_min']} runs/min")
+    if report["run_p50_ms"] is not None:
+        print(f"Run latency p50/p95: {report['run_p50_ms']:.0f} / {report['run_p95_ms']:.0f} ms")
+    print(f"Mock server: {report['mock']}")
+    print()
+    print(f"{'phase':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}")
+    for phase, stats in report["phases"].items():
+        print(f"{phase:<16}{stats['count']:>7}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="pullup-bench-")
+
+    # app 모듈을 import 하기 전에 설정 (Settings 는 import 시점에 환경변수를 읽음)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["CHROME_CDP_PORT"] = ""  # 실행 중인 크롬에 붙지 않고 새 Chromium 실행
+    os.environ["INTERACTIVE_MODE"] = "0"
+    os.environ["BROWSER_POOL_SIZE"] = str(args.concurrency)
+    os.environ["RESOURCE_PROFILE"] = args.profile
+
+    from bench.mock_cafe import create_app
+    app = create_app(latency_ms=args.latency_ms, fail_rate=args.fail_rate,
+                     layout="legacy" if args.flow == "legacy" else "modern", seed=args.seed)
+    server = start_mock(app, args.port)
+    try:
+        task_ids = seed(args.flow, args.tasks, args.concurrency, args.profile)
+        report = asyncio.run(run(args, task_ids, f"http://127.0.0.1:{args.port}"))
+        report["phases"] = phase_stats()
+        report["mock"] = dict(app.state.stats)
+        report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    finally:
+        server.should_exit = True
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+        print(f"\nDB: {os.environ['DATABASE_URL']}")
+
+
+if __name__ == "__main__":
+    main()
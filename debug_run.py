@@ -42,7 +42,9 @@ async def main():
         
         # Run in HEADED mode so user can see
         auto_engine.headless = False 
+        auto_engine.interactive = True
         await auto_engine.run_task(task.id)
+        await auto_engine.logs.close()
         print("--- DEBUG RUN COMPLETE ---")
 
 if __name__ == "__main__":
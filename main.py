@@ -6,17 +6,45 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 from fastapi import FastAPI, Request, Form, Depends, BackgroundTasks, Response
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.encoders import jsonable_encoder
 from fastapi.templating import Jinja2Templates
 from contextlib import asynccontextmanager
 from app.database import create_db_and_tables
-from app.routers import accounts, tasks
+from app.routers import accounts, tasks, queue, events
+from app.job_queue import job_queue
+from app.workers import supervisor
+from app.engine import actions
+from app.retention import retention_loop
+from app.metrics import metrics
+from app.config import settings
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    warm = None
+    if supervisor.count > 0:
+        # 작업 실행은 워커 프로세스가, 이 프로세스는 API + 스케줄러만 (사전 준비도 하지 않음)
+        # 계정 확인/수동 로그인은 예외: 사용자가 요청할 때만 이 프로세스의 브라우저를 띄움 (로그인 창은 사용자 화면에)
+        await job_queue.start(run_workers=False)
+        await supervisor.start()
+    else:
+        await job_queue.start()
+        if settings.BROWSER_PREWARM:
+            # 기다리지 않음: API 는 바로 뜨고 브라우저는 백그라운드에서 준비
+            warm = asyncio.create_task(actions.prewarm())
+    retention = asyncio.create_task(retention_loop())
     yield
+    retention.cancel()
+    if warm and not warm.done():
+        warm.cancel()
+    await job_queue.stop()
+    await supervisor.stop()
+    # 버퍼에 남은 실행 로그 저장
+    await actions.logs.close()
+    # 이 프로세스에서 띄운 브라우저/Playwright 드라이버 정리
+    await actions.close()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -25,11 +53,31 @@ templates = Jinja2Templates(directory="templates")
 
 app.include_router(accounts.router)
 app.include_router(tasks.router)
+app.include_router(queue.router)
+app.include_router(events.router)
 
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     return Response(status_code=204)
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready", include_in_schema=False)
+def readiness():
+    """브라우저가 준비됐는지 (워커 프로세스 모드에서는 워커들이 살아있는지) / 아니면 503"""
+    if supervisor.count > 0:
+        workers = supervisor.status()
+        ready = all(w["alive"] for w in workers)
+        body = {"ready": ready, "mode": "workers", "workers": workers}
+    else:
+        state = actions.readiness()
+        ready = state["browser"] == "ready"
+        body = {"ready": ready, "mode": "inline", **state}
+    return JSONResponse(jsonable_encoder(body), status_code=200 if ready else 503)
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -4,10 +4,11 @@ from app.database import create_db_and_tables
 
 async def main():
     print("Initializing Engine in Manual Mode...")
-    engine = AutomationEngine(headless=False)
+    engine = AutomationEngine(headless=False, interactive=True)
     # Task ID 1 is the default test task
     print("Running Task 1 directly...")
     await engine.run_task(1)
+    await engine.logs.close()
     print("Manual Trigger Complete.")
 
 if __name__ == "__main__":
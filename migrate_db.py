@@ -3,20 +3,55 @@ import os
 
 db_path = "database.db"
 
+# (table, column, type) - 기존 DB에 없는 컬럼만 추가됨
+# 새 테이블은 서버 시작 시 create_db_and_tables()가 생성
+COLUMNS = [
+    ("task", "title", "VARCHAR"),
+    ("task", "schedule_interval_minutes", "INTEGER"),
+    ("task", "schedule_cron", "VARCHAR"),
+    ("task", "next_run_at", "DATETIME"),
+    ("account", "session_checked_at", "DATETIME"),
+    ("task", "resource_profile", "VARCHAR"),
+    ("taskrun", "blocked_requests", "INTEGER DEFAULT 0"),
+    ("taskrun", "blocked_bytes", "INTEGER DEFAULT 0"),
+    ("task", "club_id", "INTEGER"),
+    ("task", "menu_id", "INTEGER"),
+    ("task", "content_format", "VARCHAR"),
+    ("job", "account_id", "INTEGER"),
+    ("job", "worker_id", "VARCHAR"),
+    ("task", "max_retries", "INTEGER"),
+    ("taskrun", "error_kind", "VARCHAR"),
+    ("job", "attempts", "INTEGER DEFAULT 0"),
+    ("worker", "circuits_json", "VARCHAR"),
+]
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_log_task_id_timestamp", "log", "task_id, timestamp"),
+    ("ix_log_timestamp", "log", "timestamp"),
+]
+
 if os.path.exists(db_path):
     print(f"Migrating {db_path}...")
     con = sqlite3.connect(db_path)
     cur = con.cursor()
     try:
-        # Check if column exists
-        cur.execute("SELECT title FROM task LIMIT 1")
-    except:
-        # Column likely missing, add it
-        try:
-            cur.execute("ALTER TABLE task ADD COLUMN title VARCHAR")
-            print("Added 'title' column to 'task' table.")
-        except Exception as e:
-            print(f"Migration error: {e}")
+        for table, column, col_type in COLUMNS:
+            try:
+                # Check if column exists
+                cur.execute(f"SELECT {column} FROM {table} LIMIT 1")
+            except sqlite3.OperationalError:
+                # Column likely missing, add it
+                try:
+                    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+                    print(f"Added '{column}' column to '{table}' table.")
+                except Exception as e:
+                    print(f"Migration error: {e}")
+        for name, table, columns in INDEXES:
+            try:
+                cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+            except Exception as e:
+                print(f"Migration error: {e}")
     finally:
         con.commit()
         con.close()
@@ -0,0 +1,65 @@
+import sys
+import asyncio
+import argparse
+import os
+import signal
+
+# Force ProactorEventLoop on Windows for Playwright compatibility
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+from app.config import settings
+from app.job_queue import JobQueue
+from app.engine import actions
+from app.workers import worker_name
+
+
+async def main(index, count):
+    """
+    워커 프로세스 (WORKER_PROCESSES > 0 일 때 API 서버가 실행)
+    자기 몫(account_id % count == index)의 작업만 가져와서 이 프로세스의 브라우저로 실행
+    """
+    name = worker_name(index)
+    queue = JobQueue(
+        actions.run_task,
+        workers=settings.QUEUE_WORKERS,
+        cafe_limit=settings.QUEUE_CAFE_CONCURRENCY,
+        max_depth=settings.QUEUE_MAX_DEPTH,
+        poll_interval=settings.QUEUE_POLL_SEC,
+        worker_id=name,
+        shard=(index, count),
+    )
+
+    stop = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    except NotImplementedError:
+        pass  # Windows: terminate() 는 바로 종료
+
+    await queue.start(run_scheduler=False)
+    warm = asyncio.create_task(actions.prewarm(shard=(index, count))) if settings.BROWSER_PREWARM else None
+    parent = os.getppid()
+    try:
+        while not stop.is_set():
+            # API 서버가 죽으면 같이 종료 (남은 작업은 서버 재시작 시 다시 대기열로)
+            if os.getppid() != parent:
+                print(f"{name}: coordinator exited, shutting down")
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), settings.WORKER_HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if warm and not warm.done():
+            warm.cancel()
+        await queue.stop()
+        await actions.logs.close()
+        await actions.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pull-up automation worker process")
+    parser.add_argument("--index", type=int, default=0)
+    parser.add_argument("--count", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.index, args.count))